@@ -0,0 +1,240 @@
+"""
+Structured JSON access logs, written off the request path.
+
+AccessLogMiddleware wraps the WSGI app and, once a response body has been
+sent, appends one small tuple to an AccessLog queue.  The queue is a plain
+deque (append and popleft are atomic, so requests never take a lock or
+wait on I/O); when it is full new entries are dropped and counted instead.
+A background thread drains it every `flush_interval` seconds, encodes the
+entries as JSON lines and writes each batch with one call, rotating the
+file by size.  A batch that cannot be written is counted in `failed` and
+the file is reopened for the next one.
+
+Rotation renames files, which is only safe with one writer per file, so
+each process writes its own file: "access.log" becomes "access.<pid>.log".
+Create the AccessLog in the worker process, after any fork.
+
+Each line has: ts, method, route (the matched URL rule, null when nothing
+matched), status, latency_ms, bytes, request_id, and sample_rate when the
+entry was sampled.  Code in front of the router records the route by
+setting environ[ROUTE_KEY].
+"""
+
+import atexit
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+ROUTE_KEY = "app.route"
+REQUEST_ID_KEY = "app.request_id"
+MAX_REQUEST_ID = 128
+
+logger = logging.getLogger(__name__)
+
+
+def process_path(path):
+    """This process's log file: "access.log" -> "access.<pid>.log"."""
+    root, ext = os.path.splitext(path)
+    return f"{root}.{os.getpid()}{ext}"
+
+
+def parse_sample_rates(spec):
+    """"/health=0.01,/=0.1" -> {"/health": 0.01, "/": 0.1}"""
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        route, _, rate = item.rpartition("=")
+        rates[route] = float(rate)
+    return rates
+
+
+class AccessLog:
+    """Bounded queue of access entries plus the thread that writes them.
+
+    `sample_rates` maps route templates to the fraction of their 2xx
+    responses to keep; errors and other routes are always logged.
+    `dropped` counts entries lost to a full queue (approximately, since it
+    is updated without a lock), `failed` those lost to write errors.
+    """
+
+    def __init__(self, path, max_bytes=10 * 2**20, backups=5, capacity=10_000,
+                 batch_size=500, flush_interval=0.5, sample_rates=None):
+        self.path = process_path(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.sample_rates = dict(sample_rates or {})
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self._entries = deque()
+        self._file = open(self.path, "ab")
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="access-log", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def record(self, method, route, status, latency, size, request_id):
+        """Queue one entry; never blocks."""
+        rate = None
+        if 200 <= status < 300:
+            rate = self.sample_rates.get(route)
+            if rate is not None and random.random() >= rate:
+                return
+        if len(self._entries) >= self.capacity:
+            self.dropped += 1
+            return
+        self._entries.append((time.time(), method, route, status, latency, size, request_id, rate))
+
+    def _format(self, entry):
+        ts, method, route, status, latency, size, request_id, rate = entry
+        line = {
+            "ts": datetime.fromtimestamp(ts, timezone.utc).isoformat(timespec="milliseconds"),
+            "method": method,
+            "route": route,
+            "status": status,
+            "latency_ms": round(latency * 1000, 3),
+            "bytes": size,
+            "request_id": request_id,
+        }
+        if rate is not None:
+            line["sample_rate"] = rate
+        return json.dumps(line, separators=(",", ":")).encode("utf-8") + b"\n"
+
+    def _rotate(self):
+        self._file.close()
+        for i in range(self.backups - 1, 0, -1):
+            source = f"{self.path}.{i}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{i + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._file = open(self.path, "ab")
+
+    def _reopen(self):
+        """Drop a file handle that failed; the next write opens the path again."""
+        file, self._file = self._file, None
+        if file is not None:
+            try:
+                file.close()
+            except OSError:
+                pass
+
+    def _write(self, lines):
+        """One write per file for a batch, rotating before max_bytes is passed."""
+        if self._file is None:
+            self._file = open(self.path, "ab")
+        size = self._file.tell()
+        start = 0
+        for i, line in enumerate(lines):
+            if size and size + len(line) > self.max_bytes:
+                self._file.write(b"".join(lines[start:i]))
+                self._rotate()
+                size = 0
+                start = i
+            size += len(line)
+        self._file.write(b"".join(lines[start:]))
+        self._file.flush()
+
+    def flush(self):
+        """Write everything queued so far, one batch at a time."""
+        entries = self._entries
+        while entries:
+            lines = [self._format(entries.popleft()) for _ in range(min(self.batch_size, len(entries)))]
+            try:
+                self._write(lines)
+            except OSError as exc:
+                logger.warning("access log write failed, %d entries lost: %s", len(lines), exc)
+                self.failed += len(lines)
+                self._reopen()
+            else:
+                self.written += len(lines)
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                # Keep logging whatever went wrong with this batch
+                logger.exception("access log flush failed")
+
+    def close(self):
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join()
+        self.flush()
+        self._reopen()
+
+
+class _LoggedBody:
+    """Response iterable that counts bytes and logs once the body is sent.
+
+    The entry is recorded when iteration finishes, or on close() if the
+    client went away first.
+    """
+
+    def __init__(self, body, on_done):
+        self._body = body
+        self._on_done = on_done
+        self.size = 0
+
+    def _done(self):
+        on_done, self._on_done = self._on_done, None
+        if on_done is not None:
+            on_done(self.size)
+
+    def __iter__(self):
+        for chunk in self._body:
+            self.size += len(chunk)
+            yield chunk
+        self._done()
+
+    def close(self):
+        try:
+            if hasattr(self._body, "close"):
+                self._body.close()
+        finally:
+            self._done()
+
+
+class AccessLogMiddleware:
+    """Wrap a WSGI app: app.wsgi_app = AccessLogMiddleware(app.wsgi_app, log).
+
+    Reuses the client's X-Request-ID or makes one, exposes it to the app as
+    environ[REQUEST_ID_KEY] and echoes it in the response headers.
+    """
+
+    def __init__(self, app, log):
+        self.app = app
+        self.log = log
+
+    def __call__(self, environ, start_response):
+        start = time.perf_counter()
+        request_id = environ.get("HTTP_X_REQUEST_ID", "")[:MAX_REQUEST_ID] or os.urandom(8).hex()
+        environ[REQUEST_ID_KEY] = request_id
+        status = [500]
+
+        def capture(status_line, headers, exc_info=None):
+            status[0] = int(status_line[:3])
+            headers.append(("X-Request-ID", request_id))
+            return start_response(status_line, headers, exc_info)
+
+        def finish(size):
+            self.log.record(environ["REQUEST_METHOD"], environ.get(ROUTE_KEY), status[0],
+                            time.perf_counter() - start, size, request_id)
+
+        try:
+            body = self.app(environ, capture)
+        except BaseException:
+            finish(0)
+            raise
+        return _LoggedBody(body, finish)
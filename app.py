@@ -1,158 +1,510 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, abort
 from flask_cors import CORS
 import json
 import os
 from datetime import datetime
+from functools import wraps
+
+from access_log import ROUTE_KEY, AccessLog, AccessLogMiddleware, parse_sample_rates
+from codec import MSGPACK_MIMETYPE, MSGPACK_MIMETYPES, DecodeError, packb, unpackb
+from edge import EdgeMiddleware
+from models import User, from_iso, to_iso
+from schema import Field, compile_schema, validate_many
+from sharded_store import ShardedUserStore
+from single_flight import SingleFlight
+from snapshot import (SnapshotPublisher, SnapshotReader, SnapshotUnavailable, SnapshotWriter,
+                      encode_user, page_body)
+from store import UserStore, EmailExistsError
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
+# Request body limits in bytes, checked against Content-Length before the
+# body is read.  MAX_CONTENT_LENGTH caps chunked bodies; Werkzeug cuts those
+# off silently at the cap, so one spare byte lets limit_body see the overrun.
+MAX_USER_BODY = 4 * 1024
+MAX_LOOKUP_BODY = 64 * 1024
+MAX_BULK_BODY = 1024 * 1024
+app.config['MAX_CONTENT_LENGTH'] = MAX_BULK_BODY + 1
+
+# User payload rules, compiled into validator functions once at startup
+USER_FIELDS = {
+    "name": Field(str, min_length=1, max_length=100),
+    "email": Field(str, min_length=3, max_length=254, format="email"),
+}
+validate_user = compile_schema(USER_FIELDS, name="user")
+validate_user_update = compile_schema(USER_FIELDS, name="user", partial=True)
+MAX_BULK_USERS = 1000
+
+# Identical concurrent reads share one computation and one encoded body
+read_flight = SingleFlight()
+
 # In-memory data storage (in production, use a database)
-users = [
-    {"id": 1, "name": "John Doe", "email": "john@example.com", "created_at": "2024-01-01T00:00:00"},
-    {"id": 2, "name": "Jane Smith", "email": "jane@example.com", "created_at": "2024-01-02T00:00:00"}
+seed_users = [
+    User(1, "John Doe", "john@example.com", from_iso("2024-01-01T00:00:00")),
+    User(2, "Jane Smith", "jane@example.com", from_iso("2024-01-02T00:00:00"))
 ]
 
-# Helper function to find user by ID
-def find_user_by_id(user_id):
-    return next((user for user in users if user["id"] == user_id), None)
+# USER_SNAPSHOT_PATH serves reads from a shared memory snapshot (e.g.
+# /dev/shm/users.snapshot).  The one process started with
+# USER_SNAPSHOT_WRITER=1 owns the data, answers from its store and
+# publishes the snapshot; every other worker is a reader that maps it
+# read-only, answers all reads from it and refuses writes, pointing clients
+# at USER_SNAPSHOT_WRITER_URL.  `snapshot` is only set on readers.
+snapshot = None
+snapshot_publisher = None
+snapshot_path = os.environ.get('USER_SNAPSHOT_PATH')
+snapshot_writer_url = os.environ.get('USER_SNAPSHOT_WRITER_URL')
+read_only = bool(snapshot_path) and os.environ.get('USER_SNAPSHOT_WRITER') != '1'
+
+# USER_STORE_SHARDS=N partitions the store across N shards; with
+# USER_STORE_PATH set, each shard is a SQLite file in that directory
+shard_count = int(os.environ.get('USER_STORE_SHARDS', 1))
+store_path = os.environ.get('USER_STORE_PATH')
+if read_only:
+    snapshot = SnapshotReader(snapshot_path)
+    store = None
+elif shard_count > 1 or store_path:
+    store = ShardedUserStore(shard_count, seed_users, path=store_path)
+else:
+    store = UserStore(seed_users)
+
+if snapshot_path and not read_only:
+    snapshot_size = int(os.environ.get('USER_SNAPSHOT_SIZE', 64 * 2**20))
+    snapshot_publisher = SnapshotPublisher(store, SnapshotWriter(snapshot_path, snapshot_size))
+
+# Helper function to republish the snapshot after a write
+def users_changed():
+    if snapshot_publisher:
+        snapshot_publisher.notify()
+
+# Helper function to check whether the client asked for MessagePack
+def wants_msgpack():
+    best = request.accept_mimetypes.best_match(('application/json',) + MSGPACK_MIMETYPES)
+    return best in MSGPACK_MIMETYPES
+
+# Helper function to encode a response as JSON or MessagePack per Accept
+def respond(payload, status=200, headers=None):
+    if wants_msgpack():
+        response = app.response_class(packb(payload), mimetype=MSGPACK_MIMETYPE)
+    else:
+        response = jsonify(payload)
+    response.status_code = status
+    if headers:
+        response.headers.update(headers)
+    return response
+
+# Helper function to send a body that is already encoded as JSON bytes
+def respond_encoded(body, status=200, headers=None):
+    if wants_msgpack():
+        return respond(json.loads(body), status, headers)
+    return app.response_class(body, status=status, headers=headers, mimetype='application/json')
+
+# Helper function to decode a JSON or MessagePack request body
+def parse_body():
+    if request.mimetype in MSGPACK_MIMETYPES:
+        try:
+            return unpackb(request.get_data())
+        except DecodeError:
+            abort(400)
+    return request.get_json()
+
+# Helper decorator to reject oversized bodies before they are parsed
+def limit_body(max_bytes):
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            length = request.content_length
+            if length is None:
+                # Chunked upload: already bounded by MAX_CONTENT_LENGTH
+                length = len(request.get_data())
+            if length > max_bytes:
+                return respond({"error": f"Request body must be at most {max_bytes} bytes"}, 413)
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+# Helper decorator to refuse writes on snapshot reader workers, which hold
+# no data of their own
+def writer_only(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if read_only:
+            payload = {"error": "This worker is read-only; send writes to the snapshot writer"}
+            if snapshot_writer_url:
+                payload["writer"] = snapshot_writer_url
+            return respond(payload, 503)
+        return view(*args, **kwargs)
+    return wrapper
+
+# Record the matched URL rule for the access log
+@app.before_request
+def record_route():
+    if request.url_rule:
+        request.environ[ROUTE_KEY] = request.url_rule.rule
 
-# Helper function to get next user ID
-def get_next_user_id():
-    return max([user["id"] for user in users], default=0) + 1
+# Responses depend on the Accept header, so caches must key on it
+@app.after_request
+def vary_on_accept(response):
+    response.vary.add('Accept')
+    return response
+
+# Helper decorator to coalesce identical concurrent GET requests
+def coalesce_reads(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        # Key on method, path, response format and normalized (sorted) query args
+        key = (request.method, request.path, wants_msgpack(),
+               tuple(sorted(request.args.items(multi=True))))
+
+        def compute():
+            response = app.make_response(view(*args, **kwargs))
+            return response.get_data(), response.status_code, list(response.headers)
+
+        (body, status, headers), _ = read_flight.do(key, compute)
+        return app.response_class(body, status=status, headers=headers)
+    return wrapper
 
 # Root endpoint
 @app.route('/', methods=['GET'])
 def home():
-    return jsonify({
+    return respond({
         "message": "Welcome to the RESTful API",
         "version": "1.0.0",
         "endpoints": {
             "GET /users": "Get all users",
+            "GET /users?after=<id>&limit=<n>": "Page through users by cursor (fast at any depth)",
+            "HEAD /users": "Get the user count and collection version",
+            "GET /users?ids=<id>,<id>": "Get many users by ID",
+            "POST /users/lookup": "Get many users by ID (JSON body: {\"ids\": [...]})",
             "GET /users/<id>": "Get user by ID",
+            "GET /users/stats": "Get user counts by domain and signup time",
             "POST /users": "Create new user",
+            "POST /users/bulk": "Create many users (JSON body: {\"users\": [...]})",
             "PUT /users/<id>": "Update user by ID",
             "DELETE /users/<id>": "Delete user by ID"
         }
     })
 
-# GET /users - Get all users
+# Multi-get limits: the most ids per request, and the size above which the
+# response is streamed, resolving LOOKUP_STREAM_THRESHOLD ids at a time
+MAX_LOOKUP_IDS = 1000
+LOOKUP_STREAM_THRESHOLD = 100
+
+# Helper function to encode the users (or error markers) for some ids, with
+# one snapshot or store read; returns (records, number found)
+def lookup_records(user_ids):
+    if snapshot:
+        records = snapshot.get_many(user_ids)
+    else:
+        records = [encode_user(user) if user else None for user in store.get_many(user_ids)]
+    
+    # Ids that were not found keep their place with an error marker
+    found = len(user_ids) - records.count(None)
+    for i, user_id in enumerate(user_ids):
+        if records[i] is None:
+            records[i] = b'{"error":"User not found","id":%d}' % user_id
+    return records, found
+
+# Helper function to resolve many ids into a (possibly streamed) response
+def lookup_response(user_ids):
+    if len(user_ids) > MAX_LOOKUP_IDS:
+        return respond({"error": f"At most {MAX_LOOKUP_IDS} ids per request"}, 400)
+    
+    # MessagePack responses are converted in one piece rather than streamed
+    if len(user_ids) <= LOOKUP_STREAM_THRESHOLD or wants_msgpack():
+        records, found = lookup_records(user_ids)
+        return respond_encoded(page_body(records, found=found, missing=len(records) - found))
+    
+    # Each chunk is looked up only when the previous one has been sent
+    def generate():
+        found = 0
+        yield b'{"data":['
+        for start in range(0, len(user_ids), LOOKUP_STREAM_THRESHOLD):
+            records, chunk_found = lookup_records(user_ids[start:start + LOOKUP_STREAM_THRESHOLD])
+            found += chunk_found
+            yield (b"," if start else b"") + b",".join(records)
+        yield b'],"found":%d,"missing":%d}' % (found, len(user_ids) - found)
+    return app.response_class(generate(), mimetype='application/json')
+
+# GET /users - Get all users (HEAD returns only the count headers)
 @app.route('/users', methods=['GET'])
 def get_users():
-    # Optional query parameters for pagination
+    # Multi-get: ?ids=1,2,3 (large id lists are streamed, so not coalesced)
+    if 'ids' in request.args:
+        try:
+            user_ids = [int(user_id) for user_id in request.args['ids'].split(',') if user_id]
+        except ValueError:
+            return respond({"error": "ids must be a comma-separated list of integers"}, 400)
+        return lookup_response(user_ids)
+    return list_users()
+
+@coalesce_reads
+def list_users():
+    # Optional query parameters for pagination and filtering
     page = request.args.get('page', 1, type=int)
     limit = request.args.get('limit', 10, type=int)
-    
+    domain = request.args.get('domain')
+    after = request.args.get('after', type=int)
     start = (page - 1) * limit
     end = start + limit
     
-    paginated_users = users[start:end]
+    # Readers list straight from the shared snapshot's pre-encoded records
+    if snapshot:
+        if request.method == 'HEAD':
+            records, total, version = snapshot.page(0, 0, domain)
+        elif after is not None:
+            records, last_id, total, version = snapshot.page_after(after, limit, domain)
+            next_cursor = last_id if records and len(records) == limit else None
+            body = page_body(records, total=total, limit=limit, next_cursor=next_cursor)
+        else:
+            records, total, version = snapshot.page(start, end, domain)
+            body = page_body(records, total=total, page=page, limit=limit,
+                             total_pages=(total + limit - 1) // limit)
+        headers = {"X-Total-Count": str(total), "X-Collection-Version": str(version)}
+        if request.method == 'HEAD':
+            return "", 200, headers
+        return respond_encoded(body, headers=headers)
+    
+    # Totals are maintained by the store on every write, so this is O(1)
+    total = store.count(domain)
+    headers = {
+        "X-Total-Count": str(total),
+        "X-Collection-Version": str(store.version())
+    }
+    if request.method == 'HEAD':
+        return "", 200, headers
     
-    return jsonify({
+    # Cursor pagination: ?after=<last id seen> instead of ?page=
+    if after is not None:
+        page_users = store.page_after(after, limit, domain)
+        next_cursor = page_users[-1].id if page_users and len(page_users) == limit else None
+        return respond({
+            "data": [user.to_dict() for user in page_users],
+            "total": total,
+            "limit": limit,
+            "next_cursor": next_cursor
+        }, headers=headers)
+    
+    paginated_users = [user.to_dict() for user in store.page(start, end, domain)]
+    
+    return respond({
         "data": paginated_users,
-        "total": len(users),
+        "total": total,
         "page": page,
         "limit": limit,
-        "total_pages": (len(users) + limit - 1) // limit
+        "total_pages": (total + limit - 1) // limit
+    }, headers=headers)
+
+# Bucket widths (in seconds) accepted by GET /users/stats
+STATS_BUCKETS = {"hour": 3600, "day": 86400, "week": 7 * 86400}
+
+# GET /users/stats - Grouped counts and signup histogram
+@app.route('/users/stats', methods=['GET'])
+@coalesce_reads
+def get_user_stats():
+    bucket = request.args.get('bucket', 'day')
+    top = request.args.get('top', 10, type=int)
+    since = request.args.get('since')
+    
+    if bucket not in STATS_BUCKETS:
+        return respond({"error": f"bucket must be one of: {', '.join(STATS_BUCKETS)}"}, 400)
+    if since is not None:
+        try:
+            since = from_iso(since)
+        except ValueError:
+            return respond({"error": "since must be an ISO-8601 datetime"}, 400)
+    
+    # Readers aggregate the snapshot's shared columns
+    stats = (snapshot or store).stats(STATS_BUCKETS[bucket], since=since, top=top)
+    
+    return respond({
+        "total": stats["total"],
+        "by_domain": [{"domain": domain, "count": count} for domain, count in stats["domains"]],
+        "signups": {
+            "bucket": bucket,
+            "data": [{"start": to_iso(start), "count": count} for start, count in stats["histogram"]]
+        }
     })
 
+# POST /users/lookup - Get many users by ID
+@app.route('/users/lookup', methods=['POST'])
+@limit_body(MAX_LOOKUP_BODY)
+def lookup_users():
+    data = parse_body()
+    user_ids = data.get('ids') if isinstance(data, dict) else None
+    if not isinstance(user_ids, list) or not all(type(user_id) is int for user_id in user_ids):
+        return respond({"error": "ids must be a list of integers"}, 400)
+    return lookup_response(user_ids)
+
 # GET /users/<id> - Get user by ID
 @app.route('/users/<int:user_id>', methods=['GET'])
+@coalesce_reads
 def get_user(user_id):
-    user = find_user_by_id(user_id)
+    if snapshot:
+        record = snapshot.get(user_id)
+        if record is not None:
+            return respond_encoded(b'{"data":' + record + b'}')
+        return respond({"error": "User not found"}, 404)
+    
+    user = store.get(user_id)
     if user:
-        return jsonify({"data": user})
-    return jsonify({"error": "User not found"}), 404
+        return respond({"data": user.to_dict()})
+    return respond({"error": "User not found"}, 404)
 
 # POST /users - Create new user
 @app.route('/users', methods=['POST'])
+@writer_only
+@limit_body(MAX_USER_BODY)
 def create_user():
-    data = request.get_json()
-    
-    # Validate required fields
-    if not data or 'name' not in data or 'email' not in data:
-        return jsonify({"error": "Name and email are required"}), 400
-    
-    # Check if email already exists
-    if any(user['email'] == data['email'] for user in users):
-        return jsonify({"error": "Email already exists"}), 400
-    
-    # Create new user
-    new_user = {
-        "id": get_next_user_id(),
-        "name": data['name'],
-        "email": data['email'],
-        "created_at": datetime.now().isoformat()
-    }
+    values, errors = validate_user(parse_body())
+    if errors:
+        return respond({"error": "Validation failed", "fields": errors}, 400)
     
-    users.append(new_user)
+    # Create new user (the store rejects duplicate emails)
+    try:
+        new_user = store.create(values['name'], values['email'])
+    except EmailExistsError:
+        return respond({"error": "Email already exists"}, 400)
+    users_changed()
     
-    return jsonify({
+    return respond({
         "message": "User created successfully",
-        "data": new_user
-    }), 201
+        "data": new_user.to_dict()
+    }, 201)
+
+# POST /users/bulk - Create many users
+@app.route('/users/bulk', methods=['POST'])
+@writer_only
+@limit_body(MAX_BULK_BODY)
+def create_users():
+    data = parse_body()
+    users = data.get('users') if isinstance(data, dict) else None
+    if not isinstance(users, list):
+        return respond({"error": "users must be a list"}, 400)
+    if len(users) > MAX_BULK_USERS:
+        return respond({"error": f"At most {MAX_BULK_USERS} users per request"}, 400)
+    
+    # Every item is checked before any is created
+    rows, errors = validate_many(users, validate_user, unique=("email",))
+    if errors:
+        return respond({"error": "Validation failed", "items": errors}, 400)
+    
+    # Emails already in the store are reported per item; the rest are created
+    created = []
+    for index, values in enumerate(rows):
+        try:
+            created.append(store.create(values['name'], values['email']).to_dict())
+        except EmailExistsError:
+            errors.append({"index": index, "fields": {"email": "already exists"}})
+    if created:
+        users_changed()
+    
+    return respond({
+        "message": f"Created {len(created)} of {len(rows)} users",
+        "data": created,
+        "errors": errors
+    }, 201 if created else 400)
 
 # PUT /users/<id> - Update user by ID
 @app.route('/users/<int:user_id>', methods=['PUT'])
+@writer_only
+@limit_body(MAX_USER_BODY)
 def update_user(user_id):
-    user = find_user_by_id(user_id)
-    if not user:
-        return jsonify({"error": "User not found"}), 404
-    
-    data = request.get_json()
-    if not data:
-        return jsonify({"error": "No data provided"}), 400
+    if not store.get(user_id):
+        return respond({"error": "User not found"}, 404)
     
-    # Update user fields
-    if 'name' in data:
-        user['name'] = data['name']
-    if 'email' in data:
-        # Check if new email already exists (excluding current user)
-        if any(u['email'] == data['email'] and u['id'] != user_id for u in users):
-            return jsonify({"error": "Email already exists"}), 400
-        user['email'] = data['email']
+    values, errors = validate_user_update(parse_body())
+    if errors:
+        return respond({"error": "Validation failed", "fields": errors}, 400)
     
-    user['updated_at'] = datetime.now().isoformat()
+    # Update user fields (the store rejects emails used by other users)
+    try:
+        user = store.update(user_id, name=values.get('name'), email=values.get('email'))
+    except EmailExistsError:
+        return respond({"error": "Email already exists"}, 400)
+    if not user:
+        return respond({"error": "User not found"}, 404)
+    users_changed()
     
-    return jsonify({
+    return respond({
         "message": "User updated successfully",
-        "data": user
+        "data": user.to_dict()
     })
 
 # DELETE /users/<id> - Delete user by ID
 @app.route('/users/<int:user_id>', methods=['DELETE'])
+@writer_only
 def delete_user(user_id):
-    user = find_user_by_id(user_id)
+    user = store.delete(user_id)
     if not user:
-        return jsonify({"error": "User not found"}), 404
-    
-    users.remove(user)
+        return respond({"error": "User not found"}, 404)
+    users_changed()
     
-    return jsonify({
+    return respond({
         "message": "User deleted successfully",
-        "data": user
+        "data": user.to_dict()
     })
 
 # Health check endpoint
 @app.route('/health', methods=['GET'])
 def health_check():
-    return jsonify({
+    return respond({
         "status": "healthy",
         "timestamp": datetime.now().isoformat()
     })
 
 # Error handlers
+@app.errorhandler(400)
+def bad_request(error):
+    return respond({"error": "Malformed request body"}, 400)
+
 @app.errorhandler(404)
 def not_found(error):
-    return jsonify({"error": "Endpoint not found"}), 404
+    return respond({"error": "Endpoint not found"}, 404)
 
 @app.errorhandler(405)
 def method_not_allowed(error):
-    return jsonify({"error": "Method not allowed"}), 405
+    return respond({"error": "Method not allowed"}, 405)
+
+@app.errorhandler(413)
+def request_too_large(error):
+    return respond({"error": f"Request body must be at most {MAX_BULK_BODY} bytes"}, 413)
+
+@app.errorhandler(415)
+def unsupported_media_type(error):
+    return respond({"error": "Content-Type must be application/json or application/msgpack"}, 415)
+
+@app.errorhandler(SnapshotUnavailable)
+def snapshot_unavailable(error):
+    return respond({"error": "User data is not available yet"}, 503, {"Retry-After": "1"})
 
 @app.errorhandler(500)
 def internal_error(error):
-    return jsonify({"error": "Internal server error"}), 500
+    return respond({"error": "Internal server error"}, 500)
+
+# Helper function to build the /health body outside of a request
+def health_body():
+    return b'{"status":"healthy","timestamp":"%s"}\n' % datetime.now().isoformat().encode()
+
+# The root catalog, health probes, CORS preflights and unknown routes are
+# answered in front of Flask; every other request goes through the app
+with app.test_request_context('/'):
+    home_body = home().get_data()
+app.wsgi_app = EdgeMiddleware(app.wsgi_app, app.url_map, {'/': home_body, '/health': health_body})
+
+# ACCESS_LOG_PATH turns on JSON access logs (see access_log.py); each process
+# writes its own file, with its pid inserted before the extension.
+# ACCESS_LOG_SAMPLE keeps only a fraction of 2xx responses for busy routes,
+# e.g. "/health=0.01,/users/<int:user_id>=0.1".
+access_log_path = os.environ.get('ACCESS_LOG_PATH')
+if access_log_path:
+    access_log = AccessLog(
+        access_log_path,
+        max_bytes=int(os.environ.get('ACCESS_LOG_MAX_BYTES', 10 * 2**20)),
+        sample_rates=parse_sample_rates(os.environ.get('ACCESS_LOG_SAMPLE', '/health=0.01'))
+    )
+    app.wsgi_app = AccessLogMiddleware(app.wsgi_app, access_log)
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,60 @@
+"""
+Codec benchmark: JSON vs MessagePack for GET /users listing pages.
+
+Run with: python bench_codecs.py [repeat]
+"""
+
+import json
+import sys
+import time
+
+import codec
+from models import User
+
+
+def listing_page(limit):
+    """The payload list_users() builds for one page of `limit` users."""
+    users = [User(i, f"User {i}", f"user{i}@example.com", 1_700_000_000 + i * 60)
+             for i in range(1, limit + 1)]
+    return {
+        "data": [user.to_dict() for user in users],
+        "total": 100_000,
+        "page": 1,
+        "limit": limit,
+        "total_pages": 100_000 // limit
+    }
+
+
+# Same settings as Flask's jsonify outside debug mode
+def json_dumps(payload):
+    return json.dumps(payload, separators=(",", ":"), sort_keys=True).encode("utf-8")
+
+
+CODECS = [("json", json_dumps, json.loads)]
+if codec.msgpack is not None:
+    CODECS.append(("msgpack", codec.packb, codec.unpackb))
+CODECS.append(("msgpack (pure)", codec._packb, codec._unpackb))
+
+
+def per_call(fn, arg, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(arg)
+    return (time.perf_counter() - start) / repeat
+
+
+if __name__ == "__main__":
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    for limit in (10, 100, 1000):
+        payload = listing_page(limit)
+        print("=" * 62)
+        print(f"Listing page of {limit} users ({repeat} runs)")
+        print("=" * 62)
+        print(f"{'codec':>15} {'bytes':>9} {'encode us':>11} {'decode us':>11}")
+        for label, encode, decode in CODECS:
+            body = encode(payload)
+            assert decode(body) == payload
+            print(f"{label:>15} {len(body):9,} "
+                  f"{per_call(encode, payload, repeat) * 1e6:11.1f} "
+                  f"{per_call(decode, body, repeat) * 1e6:11.1f}")
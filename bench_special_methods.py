@@ -0,0 +1,80 @@
+"""
+Benchmark: SpecialMethods vs FastSpecialMethods
+
+Measures construction cost, per-operator dispatch cost, attribute access
+and memory per instance.  Run with: python bench_special_methods.py [count]
+"""
+
+import contextlib
+import gc
+import os
+import sys
+import timeit
+import tracemalloc
+
+from special_methods import SpecialMethods, FastSpecialMethods
+
+# Statement templates, timed with `a` and `b` bound to instances of the class
+OPERATIONS = {
+    "construct": "cls(1, 'x')",
+    "a.value": "a.value",
+    "a.value = 1": "a.value = 1",
+    "a + b": "a + b",
+    "a + 1": "a + 1",
+    "1 + a": "1 + a",
+    "a - b": "a - b",
+    "a * b": "a * b",
+    "a / b": "a / b",
+    "a // b": "a // b",
+    "a % b": "a % b",
+    "a ** 2": "a ** 2",
+    "a += 1": "a += 1",
+    "-a": "-a",
+    "abs(a)": "abs(a)",
+    "a & b": "a & b",
+    "a << 1": "a << 1",
+    "a < b": "a < b",
+    "a == b": "a == b",
+    "hash(a)": "hash(a)",
+    "int(a)": "int(a)",
+    "len(a)": "len(a)",
+}
+
+
+def dispatch_cost(cls, statement, number):
+    """Best-of-3 nanoseconds per execution of `statement`."""
+    timer = timeit.Timer(statement, setup="a = cls(7, 'a'); b = cls(3, 'b')",
+                         globals={"cls": cls})
+    return min(timer.repeat(repeat=3, number=number)) / number * 1e9
+
+
+def memory_per_instance(cls, count):
+    gc.collect()
+    tracemalloc.start()
+    objects = [cls(i, "x") for i in range(count)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # The list itself holds one pointer per object
+    per_object = (size - sys.getsizeof(objects)) / count
+    del objects
+    return per_object
+
+
+if __name__ == "__main__":
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    classes = (SpecialMethods, FastSpecialMethods)
+
+    # SpecialMethods prints on construction and destruction; send that to
+    # /dev/null so the numbers include the call but not terminal rendering.
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        results = {name: [dispatch_cost(cls, stmt, number) for cls in classes]
+                   for name, stmt in OPERATIONS.items()}
+        memory = [memory_per_instance(cls, number) for cls in classes]
+
+    print(f"{'operation':<14}{'SpecialMethods':>16}{'Fast':>12}{'speedup':>10}")
+    print("=" * 52)
+    for name, (slow, fast) in results.items():
+        print(f"{name:<14}{slow:>13.0f} ns{fast:>9.0f} ns{slow / fast:>9.1f}x")
+    print("=" * 52)
+    print(f"{'bytes/object':<14}{memory[0]:>16.0f}{memory[1]:>12.0f}"
+          f"{memory[0] / memory[1]:>9.1f}x")
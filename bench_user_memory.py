@@ -0,0 +1,49 @@
+"""
+Memory benchmark: per-user dicts vs compact User records.
+
+Run with: python bench_user_memory.py [count]
+"""
+
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from models import User
+
+
+# Both builders mirror how app.py creates a user, one timestamp per row
+def build_dicts(count):
+    return [{"id": i, "name": f"User {i}", "email": f"user{i}@example.com",
+             "created_at": datetime.now().isoformat()}
+            for i in range(count)]
+
+
+def build_records(count):
+    return [User(i, f"User {i}", f"user{i}@example.com", int(time.time()))
+            for i in range(count)]
+
+
+def measure(build, count):
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows = build(count)
+    elapsed = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del rows
+    return size, elapsed
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    print(f"Building {count:,} users")
+    print("=" * 50)
+    results = {}
+    for label, build in (("dict", build_dicts), ("User", build_records)):
+        size, elapsed = measure(build, count)
+        results[label] = size
+        print(f"{label:>5}: {size / 2**20:8.1f} MiB total, "
+              f"{size / count:6.1f} B/user, built in {elapsed:.2f}s")
+    print(f"Saved: {(1 - results['User'] / results['dict']) * 100:.1f}%")
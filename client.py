@@ -0,0 +1,439 @@
+"""
+Client library for the users REST API.
+
+UsersClient (blocking) reuses keep-alive connections through a pooled
+requests.Session; AsyncUsersClient does the same over asyncio streams and
+pipelines bulk reads on each pooled connection.  Both retry 429/503
+responses with jittered exponential backoff and page through /users with
+the `after` cursor.
+"""
+
+import asyncio
+import json
+import random
+import ssl
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUSES = (429, 503)
+
+# Only these may be pipelined or resent after a dropped connection; a
+# resent POST could create the same user twice (or fail as a duplicate)
+SAFE_METHODS = ("GET", "HEAD")
+
+
+class APIError(Exception):
+    """A non-2xx response from the API."""
+
+    def __init__(self, status, payload):
+        message = payload.get("error") if isinstance(payload, dict) else None
+        super().__init__(f"{status}: {message or payload}")
+        self.status = status
+        self.payload = payload
+
+
+def _retry_delay(attempt, backoff, max_backoff, retry_after=None):
+    """Full-jitter exponential backoff, never shorter than Retry-After."""
+    delay = random.uniform(0, min(max_backoff, backoff * 2 ** attempt))
+    if retry_after:
+        try:
+            delay = max(delay, float(retry_after))
+        except ValueError:
+            pass
+    return delay
+
+
+def _decode(status, body):
+    payload = json.loads(body) if body else None
+    if status >= 400:
+        raise APIError(status, payload)
+    return payload
+
+
+class UsersClient:
+    """Blocking client sharing one pool of keep-alive connections."""
+
+    def __init__(self, base_url="http://localhost:5000", pool_size=10,
+                 retries=3, backoff=0.1, max_backoff=5.0, timeout=10):
+        self.base_url = base_url.rstrip("/")
+        self.pool_size = pool_size
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    def close(self):
+        self.session.close()
+
+    def request(self, method, path, params=None, json_body=None):
+        """Send a request, retrying 429/503, and return the decoded JSON."""
+        url = self.base_url + path
+        for attempt in range(self.retries + 1):
+            response = self.session.request(method, url, params=params, json=json_body,
+                                            timeout=self.timeout)
+            if response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                break
+            time.sleep(_retry_delay(attempt, self.backoff, self.max_backoff,
+                                    response.headers.get("Retry-After")))
+        return _decode(response.status_code, response.content)
+
+    def list_users(self, page=1, limit=10, domain=None):
+        params = {"page": page, "limit": limit}
+        if domain:
+            params["domain"] = domain
+        return self.request("GET", "/users", params=params)
+
+    def iter_users(self, page_size=100, domain=None):
+        """Stream every user, following the `after` cursor page by page."""
+        params = {"after": 0, "limit": page_size}
+        if domain:
+            params["domain"] = domain
+        while True:
+            page = self.request("GET", "/users", params=params)
+            yield from page["data"]
+            if page["next_cursor"] is None:
+                return
+            params["after"] = page["next_cursor"]
+
+    def get_user(self, user_id):
+        return self.request("GET", f"/users/{user_id}")["data"]
+
+    def lookup_users(self, user_ids):
+        """Fetch many users in one round-trip; missing ids carry an "error" key."""
+        return self.request("POST", "/users/lookup", json_body={"ids": list(user_ids)})["data"]
+
+    def create_user(self, name, email):
+        return self.request("POST", "/users", json_body={"name": name, "email": email})["data"]
+
+    def update_user(self, user_id, **fields):
+        return self.request("PUT", f"/users/{user_id}", json_body=fields)["data"]
+
+    def delete_user(self, user_id):
+        return self.request("DELETE", f"/users/{user_id}")["data"]
+
+    def stats(self, bucket="day", since=None, top=10):
+        params = {"bucket": bucket, "top": top}
+        if since:
+            params["since"] = since
+        return self.request("GET", "/users/stats", params=params)
+
+    def health(self):
+        return self.request("GET", "/health")
+
+    def create_users(self, users):
+        """Create many users concurrently over the pooled connections.
+
+        `users` is an iterable of {"name", "email"} dicts.  Returns one entry
+        per input, in order: the created user or the APIError raised for it.
+        """
+        def create(user):
+            try:
+                return self.create_user(user["name"], user["email"])
+            except APIError as exc:
+                return exc
+
+        with ThreadPoolExecutor(max_workers=self.pool_size) as executor:
+            return list(executor.map(create, users))
+
+
+class _Connection:
+    """One HTTP/1.1 keep-alive connection over asyncio streams."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.reusable = True
+        self.used = False
+
+    def send(self, raw):
+        self.writer.write(raw)
+
+    async def _read_head(self):
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed by server")
+        version, status = status_line.split(b" ", 2)[:2]
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return version, int(status), headers
+
+    async def read_response(self, method="GET"):
+        """Read the response to a `method` request; returns (status, headers, body)."""
+        version, status, headers = await self._read_head()
+        # Interim 1xx responses precede the real one
+        while 100 <= status < 200:
+            version, status, headers = await self._read_head()
+
+        if method == "HEAD" or status in (204, 304):
+            # No body, whatever the headers say
+            body = b""
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await self.reader.readline()
+                    break
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readline()
+            body = b"".join(chunks)
+        elif "content-length" in headers:
+            body = await self.reader.readexactly(int(headers["content-length"]))
+        else:
+            body = await self.reader.read()
+            self.reusable = False
+
+        connection = headers.get("connection", "").lower()
+        if connection == "close" or (version == b"HTTP/1.0" and connection != "keep-alive"):
+            self.reusable = False
+        self.used = True
+        return status, headers, body
+
+    def close(self):
+        self.reusable = False
+        self.writer.close()
+
+
+class AsyncUsersClient:
+    """asyncio client with a pooled keep-alive HTTP/1.1 transport.
+
+    Up to `pool_size` connections are kept open and reused.  Bulk helpers
+    pipeline up to `pipeline_depth` requests on a connection before reading
+    the responses back in order.
+    """
+
+    def __init__(self, base_url="http://localhost:5000", pool_size=10, pipeline_depth=16,
+                 retries=3, backoff=0.1, max_backoff=5.0, timeout=10):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.ssl = ssl.create_default_context() if parts.scheme == "https" else None
+        self.prefix = parts.path.rstrip("/")
+        self.host_header = parts.netloc
+        self.pool_size = pool_size
+        self.pipeline_depth = pipeline_depth
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self._idle = []
+        self._slots = asyncio.Semaphore(pool_size)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+        return False
+
+    async def close(self):
+        idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    async def _acquire(self):
+        await self._slots.acquire()
+        while self._idle:
+            conn = self._idle.pop()
+            # Skip connections the server has already closed while idle
+            if not conn.reader.at_eof():
+                return conn
+            conn.close()
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port, ssl=self.ssl), self.timeout)
+        except BaseException:
+            self._slots.release()
+            raise
+        return _Connection(reader, writer)
+
+    def _release(self, conn):
+        if conn.reusable:
+            self._idle.append(conn)
+        else:
+            conn.close()
+        self._slots.release()
+
+    def _encode(self, method, path, params=None, json_body=None):
+        target = self.prefix + path
+        if params:
+            target += "?" + urlencode(params)
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {self.host_header}",
+                 "Connection: keep-alive", "Accept: application/json"]
+        body = b""
+        if json_body is not None:
+            body = json.dumps(json_body).encode("utf-8")
+            lines.append("Content-Type: application/json")
+        lines.append(f"Content-Length: {len(body)}")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+    async def _exchange(self, raws, resend=False):
+        """Pipeline (method, raw request) pairs on one pooled connection;
+        returns the responses.
+
+        If the connection drops part-way, the responses read so far are
+        returned and the caller may resend the rest.  With resend=True (safe
+        methods only) a stale keep-alive connection that fails before any
+        response is replaced once; otherwise the error is raised, since the
+        server may have acted on the request.
+        """
+        for fresh_attempt in (False, True):
+            conn = await self._acquire()
+            reused = conn.used
+            responses = []
+            try:
+                for _, raw in raws:
+                    conn.send(raw)
+                await conn.writer.drain()
+                for method, _ in raws:
+                    responses.append(await asyncio.wait_for(conn.read_response(method), self.timeout))
+                    if not conn.reusable:
+                        break
+            except (ConnectionError, asyncio.IncompleteReadError):
+                conn.close()
+                if responses:
+                    return responses
+                if not resend or not reused or fresh_attempt:
+                    raise
+                continue
+            except BaseException:
+                conn.close()
+                raise
+            finally:
+                self._release(conn)
+            return responses
+        raise ConnectionResetError("connection closed by server")
+
+    async def request(self, method, path, params=None, json_body=None):
+        """Send one request, retrying 429/503, and return the decoded JSON."""
+        raw = self._encode(method, path, params, json_body)
+        for attempt in range(self.retries + 1):
+            (status, headers, body), = await self._exchange([(method, raw)],
+                                                            resend=method in SAFE_METHODS)
+            if status not in RETRY_STATUSES or attempt == self.retries:
+                break
+            await asyncio.sleep(_retry_delay(attempt, self.backoff, self.max_backoff,
+                                             headers.get("retry-after")))
+        return _decode(status, body)
+
+    async def _bulk(self, calls):
+        """Run (method, path, params, json_body) calls pipelined across the pool.
+
+        Only safe methods are accepted, since requests after a dropped
+        connection are resent.  Returns one entry per call, in order: the
+        decoded JSON or an APIError.
+        """
+        if any(call[0] not in SAFE_METHODS for call in calls):
+            raise ValueError(f"only {', '.join(SAFE_METHODS)} calls can be pipelined")
+        raws = [(call[0], self._encode(*call)) for call in calls]
+        results = [None] * len(raws)
+
+        async def run(indexes):
+            pending = list(indexes)
+            while pending:
+                responses = await self._exchange([raws[i] for i in pending], resend=True)
+                done = pending[:len(responses)]
+                retry = []
+                for i, (status, headers, body) in zip(done, responses):
+                    if status in RETRY_STATUSES:
+                        retry.append(i)
+                    else:
+                        try:
+                            results[i] = _decode(status, body)
+                        except APIError as exc:
+                            results[i] = exc
+                # Anything after a connection the server closed is resent too
+                pending = pending[len(responses):]
+                for i in retry:
+                    results[i] = await self.request(*calls[i])
+
+        batches = [range(i, min(i + self.pipeline_depth, len(raws)))
+                   for i in range(0, len(raws), self.pipeline_depth)]
+        await asyncio.gather(*(run(batch) for batch in batches))
+        return results
+
+    async def list_users(self, page=1, limit=10, domain=None):
+        params = {"page": page, "limit": limit}
+        if domain:
+            params["domain"] = domain
+        return await self.request("GET", "/users", params=params)
+
+    async def iter_users(self, page_size=100, domain=None):
+        """Stream every user, following the `after` cursor page by page."""
+        params = {"after": 0, "limit": page_size}
+        if domain:
+            params["domain"] = domain
+        while True:
+            page = await self.request("GET", "/users", params=params)
+            for user in page["data"]:
+                yield user
+            if page["next_cursor"] is None:
+                return
+            params["after"] = page["next_cursor"]
+
+    async def get_user(self, user_id):
+        return (await self.request("GET", f"/users/{user_id}"))["data"]
+
+    async def lookup_users(self, user_ids):
+        """Fetch many users in one round-trip; missing ids carry an "error" key."""
+        payload = await self.request("POST", "/users/lookup", json_body={"ids": list(user_ids)})
+        return payload["data"]
+
+    async def create_user(self, name, email):
+        payload = await self.request("POST", "/users", json_body={"name": name, "email": email})
+        return payload["data"]
+
+    async def update_user(self, user_id, **fields):
+        return (await self.request("PUT", f"/users/{user_id}", json_body=fields))["data"]
+
+    async def delete_user(self, user_id):
+        return (await self.request("DELETE", f"/users/{user_id}"))["data"]
+
+    async def stats(self, bucket="day", since=None, top=10):
+        params = {"bucket": bucket, "top": top}
+        if since:
+            params["since"] = since
+        return await self.request("GET", "/users/stats", params=params)
+
+    async def health(self):
+        return await self.request("GET", "/health")
+
+    async def get_users(self, user_ids):
+        """Fetch many users by id; missing ones come back as APIError."""
+        results = await self._bulk([("GET", f"/users/{user_id}", None, None)
+                                    for user_id in user_ids])
+        return [r if isinstance(r, APIError) else r["data"] for r in results]
+
+    async def create_users(self, users):
+        """Create many users concurrently over the pool, one request each.
+
+        Creates are not pipelined or resent, so a user is never created
+        twice.  Returns one entry per input: the user or its APIError.
+        """
+        async def create(user):
+            try:
+                return await self.create_user(user["name"], user["email"])
+            except APIError as exc:
+                return exc
+
+        return await asyncio.gather(*(create(user) for user in users))
@@ -0,0 +1,221 @@
+"""
+MessagePack encoding for API payloads.
+
+Uses the `msgpack` package when it is installed and falls back to the
+pure-Python codec below, which handles the types the API produces: None,
+bool, int, float, str, bytes, lists/tuples and dicts.
+"""
+
+import struct
+
+MSGPACK_MIMETYPE = "application/msgpack"
+MSGPACK_MIMETYPES = (MSGPACK_MIMETYPE, "application/x-msgpack", "application/vnd.msgpack")
+
+
+class DecodeError(ValueError):
+    """Raised for truncated or malformed MessagePack data."""
+
+
+_B = struct.Struct(">B")
+_H = struct.Struct(">H")
+_I = struct.Struct(">I")
+_Q = struct.Struct(">Q")
+_b = struct.Struct(">b")
+_h = struct.Struct(">h")
+_i = struct.Struct(">i")
+_q = struct.Struct(">q")
+_d = struct.Struct(">d")
+_f = struct.Struct(">f")
+
+
+def _pack(obj, out):
+    kind = type(obj)
+    if kind is str:
+        data = obj.encode("utf-8")
+        n = len(data)
+        if n < 32:
+            out.append(0xA0 | n)
+        elif n < 0x100:
+            out += b"\xd9" + _B.pack(n)
+        elif n < 0x10000:
+            out += b"\xda" + _H.pack(n)
+        else:
+            out += b"\xdb" + _I.pack(n)
+        out += data
+    elif kind is int:
+        if 0 <= obj < 0x80:
+            out.append(obj)
+        elif -32 <= obj < 0:
+            out.append(obj & 0xFF)
+        elif obj >= 0:
+            if obj < 0x100:
+                out += b"\xcc" + _B.pack(obj)
+            elif obj < 0x10000:
+                out += b"\xcd" + _H.pack(obj)
+            elif obj < 0x100000000:
+                out += b"\xce" + _I.pack(obj)
+            elif obj < 0x10000000000000000:
+                out += b"\xcf" + _Q.pack(obj)
+            else:
+                raise OverflowError("int too large for MessagePack")
+        elif obj >= -0x80:
+            out += b"\xd0" + _b.pack(obj)
+        elif obj >= -0x8000:
+            out += b"\xd1" + _h.pack(obj)
+        elif obj >= -0x80000000:
+            out += b"\xd2" + _i.pack(obj)
+        elif obj >= -0x8000000000000000:
+            out += b"\xd3" + _q.pack(obj)
+        else:
+            raise OverflowError("int too large for MessagePack")
+    elif obj is None:
+        out.append(0xC0)
+    elif kind is bool:
+        out.append(0xC3 if obj else 0xC2)
+    elif kind is float:
+        out += b"\xcb" + _d.pack(obj)
+    elif kind is dict:
+        n = len(obj)
+        if n < 16:
+            out.append(0x80 | n)
+        elif n < 0x10000:
+            out += b"\xde" + _H.pack(n)
+        else:
+            out += b"\xdf" + _I.pack(n)
+        for key, value in obj.items():
+            _pack(key, out)
+            _pack(value, out)
+    elif kind is list or kind is tuple:
+        n = len(obj)
+        if n < 16:
+            out.append(0x90 | n)
+        elif n < 0x10000:
+            out += b"\xdc" + _H.pack(n)
+        else:
+            out += b"\xdd" + _I.pack(n)
+        for item in obj:
+            _pack(item, out)
+    elif kind is bytes or kind is bytearray:
+        n = len(obj)
+        if n < 0x100:
+            out += b"\xc4" + _B.pack(n)
+        elif n < 0x10000:
+            out += b"\xc5" + _H.pack(n)
+        else:
+            out += b"\xc6" + _I.pack(n)
+        out += obj
+    else:
+        raise TypeError(f"cannot serialize {kind.__name__!r} object")
+
+
+def _packb(obj):
+    out = bytearray()
+    _pack(obj, out)
+    return bytes(out)
+
+
+class _Unpacker:
+    __slots__ = ("data", "pos")
+
+    def __init__(self, data):
+        self.data = memoryview(data)
+        self.pos = 0
+
+    def _take(self, n):
+        start = self.pos
+        end = start + n
+        if end > len(self.data):
+            raise DecodeError("truncated MessagePack data")
+        self.pos = end
+        return self.data[start:end]
+
+    def _unpack(self, fmt):
+        return fmt.unpack(self._take(fmt.size))[0]
+
+    def _str(self, n):
+        return str(self._take(n), "utf-8")
+
+    def _array(self, n):
+        return [self.read() for _ in range(n)]
+
+    def _map(self, n):
+        result = {}
+        for _ in range(n):
+            key = self.read()
+            result[key] = self.read()
+        return result
+
+    def read(self):
+        if self.pos >= len(self.data):
+            raise DecodeError("truncated MessagePack data")
+        code = self.data[self.pos]
+        self.pos += 1
+        if code < 0x80:
+            return code
+        if code >= 0xE0:
+            return code - 0x100
+        if 0xA0 <= code <= 0xBF:
+            return self._str(code & 0x1F)
+        if 0x90 <= code <= 0x9F:
+            return self._array(code & 0x0F)
+        if 0x80 <= code <= 0x8F:
+            return self._map(code & 0x0F)
+        reader = _READERS.get(code)
+        if reader is None:
+            raise DecodeError(f"unsupported MessagePack type 0x{code:02x}")
+        return reader(self)
+
+
+_READERS = {
+    0xC0: lambda u: None,
+    0xC2: lambda u: False,
+    0xC3: lambda u: True,
+    0xC4: lambda u: bytes(u._take(u._unpack(_B))),
+    0xC5: lambda u: bytes(u._take(u._unpack(_H))),
+    0xC6: lambda u: bytes(u._take(u._unpack(_I))),
+    0xCA: lambda u: u._unpack(_f),
+    0xCB: lambda u: u._unpack(_d),
+    0xCC: lambda u: u._unpack(_B),
+    0xCD: lambda u: u._unpack(_H),
+    0xCE: lambda u: u._unpack(_I),
+    0xCF: lambda u: u._unpack(_Q),
+    0xD0: lambda u: u._unpack(_b),
+    0xD1: lambda u: u._unpack(_h),
+    0xD2: lambda u: u._unpack(_i),
+    0xD3: lambda u: u._unpack(_q),
+    0xD9: lambda u: u._str(u._unpack(_B)),
+    0xDA: lambda u: u._str(u._unpack(_H)),
+    0xDB: lambda u: u._str(u._unpack(_I)),
+    0xDC: lambda u: u._array(u._unpack(_H)),
+    0xDD: lambda u: u._array(u._unpack(_I)),
+    0xDE: lambda u: u._map(u._unpack(_H)),
+    0xDF: lambda u: u._map(u._unpack(_I)),
+}
+
+
+def _unpackb(data):
+    unpacker = _Unpacker(data)
+    try:
+        obj = unpacker.read()
+    except (UnicodeDecodeError, TypeError, RecursionError) as exc:
+        raise DecodeError(str(exc)) from None
+    if unpacker.pos != len(unpacker.data):
+        raise DecodeError("extra data after MessagePack object")
+    return obj
+
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+    packb = _packb
+    unpackb = _unpackb
+else:
+    def packb(obj):
+        return msgpack.packb(obj, use_bin_type=True)
+
+    def unpackb(data):
+        try:
+            return msgpack.unpackb(data, raw=False, strict_map_key=False)
+        except (ValueError, TypeError, msgpack.UnpackException) as exc:
+            raise DecodeError(str(exc)) from None
@@ -0,0 +1,128 @@
+"""
+Columnar view of the user table for vectorized reporting queries.
+"""
+
+import numpy as np
+
+from models import email_domain
+
+
+def count_domains(codes, domains, top=None):
+    """(domain, count) pairs for an array of domain codes, most common first."""
+    counts = np.bincount(codes, minlength=len(domains))
+    order = np.argsort(-counts, kind="stable")
+    if top is not None:
+        order = order[:top]
+    return [(domains[code], int(counts[code])) for code in order if counts[code]]
+
+
+def count_buckets(created, width):
+    """(bucket_start, count) pairs for an array of epochs in `width`-second buckets."""
+    if not len(created):
+        return []
+    buckets = created // width
+    first = int(buckets.min())
+    span = int(buckets.max()) - first + 1
+    if span <= 4 * len(buckets):
+        # Dense range: a bincount is a single linear pass
+        counts = np.bincount(buckets - first, minlength=span)
+        keys = np.flatnonzero(counts)
+        return [((first + int(k)) * width, int(counts[k])) for k in keys]
+    keys, counts = np.unique(buckets, return_counts=True)
+    return [(int(k) * width, int(c)) for k, c in zip(keys, counts)]
+
+
+class UserColumns:
+    """Parallel NumPy columns mirroring the rows of a UserStore.
+
+    Ids and created_at epochs are int64 arrays; the email domain is a
+    dictionary-encoded int32 column.  Deleted rows are tombstoned in the
+    `alive` mask and reclaimed by compaction once they make up half the
+    table.
+    """
+
+    def __init__(self, capacity=1024):
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._created = np.zeros(capacity, dtype=np.int64)
+        self._domain = np.zeros(capacity, dtype=np.int32)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._size = 0      # rows used, including tombstones
+        self._dead = 0
+        self._rows = {}     # user id -> row position
+        self._domains = []  # code -> domain
+        self._codes = {}    # domain -> code
+
+    def _encode(self, email):
+        domain = email_domain(email)
+        code = self._codes.get(domain)
+        if code is None:
+            code = self._codes[domain] = len(self._domains)
+            self._domains.append(domain)
+        return code
+
+    def _grow(self):
+        capacity = len(self._ids) * 2
+        for name in ("_ids", "_created", "_domain", "_alive"):
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            setattr(self, name, grown)
+
+    def _compact(self):
+        keep = self._alive[:self._size]
+        size = int(keep.sum())
+        for name in ("_ids", "_created", "_domain"):
+            column = getattr(self, name)
+            column[:size] = column[:self._size][keep]
+        self._alive[:size] = True
+        self._alive[size:self._size] = False
+        self._size = size
+        self._dead = 0
+        self._rows = {int(user_id): row for row, user_id in enumerate(self._ids[:size])}
+
+    def append(self, user):
+        if self._size == len(self._ids):
+            self._grow()
+        row = self._size
+        self._ids[row] = user.id
+        self._created[row] = user.created_at
+        self._domain[row] = self._encode(user.email)
+        self._alive[row] = True
+        self._rows[user.id] = row
+        self._size += 1
+
+    def set_email(self, user_id, email):
+        self._domain[self._rows[user_id]] = self._encode(email)
+
+    def remove(self, user_id):
+        row = self._rows.pop(user_id)
+        self._alive[row] = False
+        self._dead += 1
+        if self._dead * 2 > self._size:
+            self._compact()
+
+    def _mask(self, since=None):
+        mask = self._alive[:self._size]
+        if since is not None:
+            mask = mask & (self._created[:self._size] >= since)
+        return mask
+
+    def domain_counts(self, since=None, top=None):
+        """Count users per email domain, most common first."""
+        return count_domains(self._domain[:self._size][self._mask(since)], self._domains, top)
+
+    def histogram(self, width, since=None):
+        """Count signups per `width`-second bucket, as (bucket_start, count)."""
+        return count_buckets(self._created[:self._size][self._mask(since)], width)
+
+    def ids_for_domain(self, domain):
+        """Ids of live users in `domain`, in ascending order."""
+        code = self._codes.get(domain)
+        if code is None:
+            return []
+        size = self._size
+        match = self._alive[:size] & (self._domain[:size] == code)
+        return np.sort(self._ids[:size][match]).tolist()
+
+    def count(self, since=None):
+        return int(np.count_nonzero(self._mask(since)))
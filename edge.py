@@ -0,0 +1,105 @@
+"""
+WSGI fast path in front of Flask.
+
+Answers the requests that need no application logic without going through
+Flask's request cycle: fixed GET/HEAD routes served from precomputed bytes,
+CORS preflight OPTIONS requests, and paths that match no route.  Everything
+else, and anything asking for a non-JSON response, is passed to the app.
+"""
+
+from werkzeug.exceptions import NotFound
+
+from access_log import ROUTE_KEY
+
+# Mirrors flask-cors' defaults (any origin, no credentials)
+CORS_METHODS = "DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"
+NOT_FOUND_BODY = b'{"error":"Endpoint not found"}\n'
+MAX_CACHED_PREFLIGHTS = 256
+
+
+def _json_headers(body):
+    return [
+        ("Content-Type", "application/json"),
+        ("Content-Length", str(len(body))),
+        ("Vary", "Accept"),
+        ("Access-Control-Allow-Origin", "*"),
+    ]
+
+
+class EdgeMiddleware:
+    """Wrap a WSGI app: app.wsgi_app = EdgeMiddleware(app.wsgi_app, app.url_map, routes).
+
+    `routes` maps a path to the JSON body served for GET and HEAD: bytes
+    are sent as-is, a callable is called per request for bodies that change
+    (like a timestamp).  Preflight answers are cached per
+    Access-Control-Request-Headers value and carry Access-Control-Max-Age
+    so browsers can skip repeating them.
+    """
+
+    def __init__(self, app, url_map, routes=(), max_age=86400):
+        self.app = app
+        self.routes = dict(routes)
+        self.max_age = max_age
+        self._urls = url_map.bind("localhost")
+        self._preflights = {}
+
+        # Headers for fixed bodies are built once
+        self._static = {path: _json_headers(body) for path, body in self.routes.items()
+                        if isinstance(body, bytes)}
+        self._not_found = _json_headers(NOT_FOUND_BODY)
+
+    def _preflight_headers(self, request_headers):
+        headers = self._preflights.get(request_headers)
+        if headers is None:
+            headers = [
+                ("Content-Length", "0"),
+                ("Access-Control-Allow-Origin", "*"),
+                ("Access-Control-Allow-Methods", CORS_METHODS),
+                ("Access-Control-Max-Age", str(self.max_age)),
+            ]
+            if request_headers:
+                headers.append(("Access-Control-Allow-Headers", request_headers))
+            if len(self._preflights) < MAX_CACHED_PREFLIGHTS:
+                self._preflights[request_headers] = headers
+        return headers
+
+    def _is_unknown(self, path, method):
+        try:
+            self._urls.match(path, method)
+        except NotFound:
+            return True
+        except Exception:
+            # Redirects and 405s are left to Flask
+            return False
+        return False
+
+    def __call__(self, environ, start_response):
+        method = environ["REQUEST_METHOD"]
+        path = environ.get("PATH_INFO") or "/"
+
+        if method == "OPTIONS" and "HTTP_ACCESS_CONTROL_REQUEST_METHOD" in environ:
+            request_headers = environ.get("HTTP_ACCESS_CONTROL_REQUEST_HEADERS", "")
+            start_response("200 OK", list(self._preflight_headers(request_headers)))
+            return [b""]
+
+        # Non-JSON (MessagePack) responses are negotiated by the app
+        if "msgpack" in environ.get("HTTP_ACCEPT", ""):
+            return self.app(environ, start_response)
+
+        if method in ("GET", "HEAD"):
+            body = self.routes.get(path)
+            if body is not None:
+                environ[ROUTE_KEY] = path
+                if callable(body):
+                    body = body()
+                    headers = _json_headers(body)
+                else:
+                    headers = list(self._static[path])
+                start_response("200 OK", headers)
+                return [b"" if method == "HEAD" else body]
+
+        if self._is_unknown(path, method):
+            start_response("404 NOT FOUND", list(self._not_found))
+            return [b"" if method == "HEAD" else NOT_FOUND_BODY]
+
+        return self.app(environ, start_response)
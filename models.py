@@ -0,0 +1,52 @@
+"""
+Compact record types for the API's in-memory data.
+"""
+
+from datetime import datetime
+
+
+def to_iso(timestamp):
+    """Render an integer epoch (seconds) as the API's ISO-8601 string."""
+    return datetime.fromtimestamp(timestamp).isoformat()
+
+
+def from_iso(value):
+    """Parse an ISO-8601 string into an integer epoch (seconds)."""
+    return int(datetime.fromisoformat(value).timestamp())
+
+
+def email_domain(email):
+    """The lower-cased domain part of an email address."""
+    return email.rpartition("@")[2].lower()
+
+
+class User:
+    """A single user, stored without a per-instance __dict__.
+
+    Timestamps are integer epochs; they are only turned into ISO strings
+    when the record is converted for a response.
+    """
+
+    __slots__ = ("id", "name", "email", "created_at", "updated_at")
+
+    def __init__(self, id, name, email, created_at, updated_at=None):
+        self.id = id
+        self.name = name
+        self.email = email
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+    def __repr__(self):
+        return f"User(id={self.id}, name='{self.name}', email='{self.email}')"
+
+    def to_dict(self):
+        """Convert to the JSON-ready dict returned by the API."""
+        data = {
+            "id": self.id,
+            "name": self.name,
+            "email": self.email,
+            "created_at": to_iso(self.created_at)
+        }
+        if self.updated_at is not None:
+            data["updated_at"] = to_iso(self.updated_at)
+        return data
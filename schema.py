@@ -0,0 +1,119 @@
+"""
+Declarative validation for request payloads.
+
+A schema is a dict of field name -> Field.  compile_schema() turns it into
+a single validate(data) function once, at import time, so each request
+only pays for the checks themselves: one type test, a length comparison
+and (for emails) one precompiled regex match per field.
+"""
+
+import re
+
+# Deliberately loose: one @, no whitespace, a dot in the domain
+EMAIL_RE = re.compile(r"[^@\s]+@[^@\s.]+(\.[^@\s.]+)+")
+
+FORMATS = {
+    "email": (EMAIL_RE.fullmatch, "must be a valid email address"),
+}
+
+_TYPE_NAMES = {str: "a string", int: "an integer", bool: "a boolean", list: "a list", dict: "an object"}
+
+
+class Field:
+    """One field of a schema."""
+
+    __slots__ = ("type", "required", "min_length", "max_length", "format")
+
+    def __init__(self, type=str, required=True, min_length=None, max_length=None, format=None):
+        if format is not None and format not in FORMATS:
+            raise ValueError(f"unknown format {format!r}")
+        self.type = type
+        self.required = required
+        self.min_length = min_length
+        self.max_length = max_length
+        self.format = format
+
+
+def _compile_field(field):
+    """A check(value) function returning an error message or None."""
+    kind = field.type
+    low, high = field.min_length, field.max_length
+    matches, format_message = FORMATS[field.format] if field.format else (None, None)
+    type_message = f"must be {_TYPE_NAMES.get(kind, kind.__name__)}"
+    sized = low is not None or high is not None
+    min_message = "must not be empty" if low == 1 else f"must be at least {low} characters"
+
+    def check(value):
+        # type() rather than isinstance() so True is not accepted as an int
+        if type(value) is not kind:
+            return type_message
+        if sized:
+            size = len(value)
+            if low is not None and size < low:
+                return min_message
+            if high is not None and size > high:
+                return f"must be at most {high} characters"
+        if matches is not None and not matches(value):
+            return format_message
+        return None
+    return check
+
+
+def compile_schema(fields, name="body", partial=False):
+    """Build validate(data) -> (values, errors) for a dict payload.
+
+    `values` holds the valid fields that were given; `errors` maps field
+    names to messages and is empty when the payload is valid.  Missing and
+    null fields are treated alike.  With partial=True (updates) every field
+    is optional, but at least one must be present.  Unknown keys are ignored.
+    """
+    checks = [(field_name, _compile_field(field), field.required and not partial)
+              for field_name, field in fields.items()]
+    object_error = {name: "must be an object"}
+    empty_error = {name: f"must include at least one of: {', '.join(fields)}"}
+
+    def validate(data):
+        if type(data) is not dict:
+            return {}, dict(object_error)
+        values = {}
+        errors = {}
+        for field_name, check, required in checks:
+            value = data.get(field_name)
+            if value is None:
+                if required:
+                    errors[field_name] = "is required"
+                continue
+            message = check(value)
+            if message is None:
+                values[field_name] = value
+            else:
+                errors[field_name] = message
+        if partial and not values and not errors:
+            return values, dict(empty_error)
+        return values, errors
+    return validate
+
+
+def validate_many(items, validate, unique=()):
+    """Validate a list of payloads in one pass.
+
+    Returns (values, errors): one values dict per item, and a list of
+    {"index", "fields"} entries for the items that failed.  Fields named in
+    `unique` must also differ between items.
+    """
+    seen = {field_name: set() for field_name in unique}
+    rows = []
+    errors = []
+    for index, item in enumerate(items):
+        values, item_errors = validate(item)
+        for field_name in unique:
+            value = values.get(field_name)
+            if value is None:
+                continue
+            if value in seen[field_name]:
+                item_errors[field_name] = "is repeated in this request"
+            seen[field_name].add(value)
+        if item_errors:
+            errors.append({"index": index, "fields": item_errors})
+        rows.append(values)
+    return rows, errors
@@ -0,0 +1,312 @@
+"""
+Sharded user store: users partitioned across UserStores (in memory) or
+SQLite files by consistent hash.
+"""
+
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from bisect import bisect_right
+from hashlib import blake2b
+from itertools import islice
+
+from models import User
+from sqlite_store import SQLiteUserStore
+from store import UserStore, EmailExistsError
+
+
+def _hash(key):
+    return int.from_bytes(blake2b(str(key).encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class ConsistentHashRing:
+    """Hash ring with virtual nodes; a new node only claims its own arcs."""
+
+    def __init__(self, nodes=(), vnodes=64):
+        self.vnodes = vnodes
+        self._points = []   # sorted hash points
+        self._owners = {}   # point -> node
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node):
+        for i in range(self.vnodes):
+            point = _hash(f"{node}#{i}")
+            self._owners[point] = node
+        self._points = sorted(self._owners)
+
+    def node_for(self, key):
+        if not self._points:
+            raise LookupError("hash ring has no nodes")
+        index = bisect_right(self._points, _hash(key)) % len(self._points)
+        return self._owners[self._points[index]]
+
+
+class ShardedUserStore:
+    """Drop-in replacement for UserStore that spreads users over shards.
+
+    Users are routed by a consistent hash of their id.  With `path` (a
+    directory), each shard is its own SQLite file there, so the data is not
+    bounded by this process's memory; reopening a directory uses the shard
+    files found in it rather than `shards`.  Without it, shards are
+    in-memory UserStores.
+
+    Writes lock only the shard that owns the user, so writes to different
+    shards run in parallel.  The email routing index (which enforces global
+    uniqueness) has its own small lock, taken only while an email is
+    claimed or released.  add_shard()/remove_shard() hold every shard lock.
+    Listings merge the per-shard id-ordered streams.
+    """
+
+    def __init__(self, shards=4, users=(), vnodes=64, path=None):
+        self.path = path
+        self._shards = {}
+        self._locks = {}        # shard name -> write lock (kept after removal)
+        existing = self._existing_shards()
+        names = existing or [f"shard-{i}" for i in range(shards)]
+        for name in names:
+            self._shards[name] = self._open_shard(name)
+        self._ring = ConsistentHashRing(self._shards, vnodes)
+        self._emails_lock = threading.Lock()
+        self._emails = {}       # email -> id, across all shards
+        self._retired_version = 0
+        for shard in self._shards.values():
+            for user in shard.page(0, None):
+                self._emails[user.email] = user.id
+        if not existing:
+            # Seed only a new store, not one reopened from disk (even if empty)
+            for user in users:
+                self._place(user)
+        last_id = max(self._emails.values(), default=0)
+        self._id_seq = itertools.count(last_id + 1)   # next() is atomic
+
+    def _existing_shards(self):
+        """Names of the shard files already in `path`, so a reopen keeps its topology."""
+        if self.path is None or not os.path.isdir(self.path):
+            return []
+        return sorted(name[:-len(".sqlite3")] for name in os.listdir(self.path)
+                      if name.endswith(".sqlite3"))
+
+    def _open_shard(self, name):
+        if self.path is None:
+            shard = UserStore()
+        else:
+            os.makedirs(self.path, exist_ok=True)
+            shard = SQLiteUserStore(os.path.join(self.path, f"{name}.sqlite3"))
+        self._locks.setdefault(name, threading.Lock())
+        return shard
+
+    def _shard_for(self, user_id):
+        return self._shards[self._ring.node_for(user_id)]
+
+    def _place(self, user):
+        if user.email in self._emails:
+            raise EmailExistsError(user.email)
+        self._shard_for(user.id).add(user)
+        self._emails[user.email] = user.id
+
+    @contextmanager
+    def _owner(self, user_id):
+        """Hold the write lock of the shard that owns user_id and yield it."""
+        while True:
+            ring = self._ring
+            name = ring.node_for(user_id)
+            with self._locks[name]:
+                # The ring may have changed while we waited for the lock
+                if self._ring is ring:
+                    yield self._shards[name]
+                    return
+
+    def _claim_email(self, email, user_id):
+        with self._emails_lock:
+            if email in self._emails:
+                raise EmailExistsError(email)
+            self._emails[email] = user_id
+
+    def _release_email(self, email):
+        with self._emails_lock:
+            del self._emails[email]
+
+    # -- collection metadata ---------------------------------------------
+
+    def count(self, domain=None):
+        return sum(shard.count(domain) for shard in self._shards.values())
+
+    def version(self):
+        """Changes on every write: the shards' sequences plus those of removed shards."""
+        return self._retired_version + sum(shard.version() for shard in self._shards.values())
+
+    def shard_sizes(self):
+        return {name: shard.count() for name, shard in self._shards.items()}
+
+    # -- reads ------------------------------------------------------------
+
+    def get(self, user_id):
+        return self._shard_for(user_id).get(user_id)
+
+    def get_many(self, user_ids):
+        """Users (or None) for each id: one get_many call per shard involved."""
+        positions = {}
+        for position, user_id in enumerate(user_ids):
+            positions.setdefault(self._ring.node_for(user_id), []).append(position)
+        result = [None] * len(user_ids)
+        for node, indexes in positions.items():
+            users = self._shards[node].get_many([user_ids[i] for i in indexes])
+            for i, user in zip(indexes, users):
+                result[i] = user
+        return result
+
+    def _stream(self, after_id, domain, batch):
+        """Merge the shards' cursor streams into one id-ordered stream."""
+        def cursor(shard):
+            last = after_id
+            while True:
+                users = shard.page_after(last, batch, domain)
+                yield from users
+                if len(users) < batch:
+                    return
+                last = users[-1].id
+
+        return heapq.merge(*(cursor(shard) for shard in self._shards.values()),
+                           key=lambda user: user.id)
+
+    def page(self, start, end, domain=None):
+        """Users at positions [start:end] in id order.
+
+        Shards cannot skip to a global position, so this walks every shard
+        from its first user: the cost grows with `start`.  Use page_after()
+        (the API's ?after= cursor) for deep pages.
+        """
+        start = max(start, 0)
+        if end is not None and end <= start:
+            return []
+        batch = 100 if end is None else min(end - start, 1000)
+        return list(islice(self._stream(0, domain, batch), start, end))
+
+    def page_after(self, after_id, limit, domain=None):
+        if limit <= 0:
+            return []
+        return list(islice(self._stream(after_id, domain, limit), limit))
+
+    def stats(self, bucket_seconds, since=None, top=None):
+        total = 0
+        domains = {}
+        histogram = {}
+        for shard in self._shards.values():
+            stats = shard.stats(bucket_seconds, since=since)
+            total += stats["total"]
+            for domain, count in stats["domains"]:
+                domains[domain] = domains.get(domain, 0) + count
+            for start, count in stats["histogram"]:
+                histogram[start] = histogram.get(start, 0) + count
+        ranked = sorted(domains.items(), key=lambda item: -item[1])
+        return {
+            "total": total,
+            "domains": ranked[:top] if top is not None else ranked,
+            "histogram": sorted(histogram.items())
+        }
+
+    # -- writes -----------------------------------------------------------
+
+    def create(self, name, email):
+        user_id = next(self._id_seq)
+        self._claim_email(email, user_id)
+        try:
+            with self._owner(user_id) as shard:
+                return shard.add(User(user_id, name, email, int(time.time())))
+        except BaseException:
+            self._release_email(email)
+            raise
+
+    def update(self, user_id, name=None, email=None):
+        with self._owner(user_id) as shard:
+            user = shard.get(user_id)
+            if user is None:
+                return None
+            old_email = user.email
+            changed = email is not None and email != old_email
+            if changed:
+                self._claim_email(email, user_id)
+            try:
+                user = shard.update(user_id, name=name, email=email)
+            except BaseException:
+                if changed:
+                    self._release_email(email)
+                raise
+            if changed:
+                self._release_email(old_email)
+            return user
+
+    def delete(self, user_id):
+        with self._owner(user_id) as shard:
+            user = shard.delete(user_id)
+            if user is not None:
+                self._release_email(user.email)
+            return user
+
+    # -- topology ---------------------------------------------------------
+
+    @contextmanager
+    def _all_shards_locked(self):
+        names = sorted(self._shards)
+        for name in names:
+            self._locks[name].acquire()
+        try:
+            yield
+        finally:
+            for name in reversed(names):
+                self._locks[name].release()
+
+    def add_shard(self, name=None):
+        """Add a shard and move only the users the ring now routes to it.
+
+        Users are copied before the ring is switched and removed from their
+        old shard afterwards, so reads by id always find them.  Returns the
+        number of users moved.
+        """
+        with self._all_shards_locked():
+            if name is None:
+                name = next(f"shard-{i}" for i in itertools.count(len(self._shards))
+                            if f"shard-{i}" not in self._shards)
+            if name in self._shards:
+                raise ValueError(f"shard {name!r} already exists")
+            ring = ConsistentHashRing([*self._shards, name], self._ring.vnodes)
+            moves = [(shard, user) for shard in self._shards.values()
+                     for user in shard.page(0, None) if ring.node_for(user.id) == name]
+            # Not visible to listings until the ring switches
+            target = self._open_shard(name)
+            for _, user in moves:
+                target.add(user)
+            self._shards = {**self._shards, name: target}
+            self._ring = ring
+            for shard, user in moves:
+                shard.delete(user.id)
+            return len(moves)
+
+    def remove_shard(self, name):
+        """Remove a shard, handing its users to their new ring owners.
+
+        A SQLite shard's file is deleted once its users have moved.
+        """
+        with self._all_shards_locked():
+            if name not in self._shards:
+                raise KeyError(name)
+            if len(self._shards) == 1:
+                raise ValueError("cannot remove the last shard")
+            ring = ConsistentHashRing([n for n in self._shards if n != name], self._ring.vnodes)
+            removed = self._shards[name]
+            users = removed.page(0, None)
+            for user in users:
+                self._shards[ring.node_for(user.id)].add(user)
+            self._ring = ring
+            self._retired_version += removed.version()
+            self._shards = {n: shard for n, shard in self._shards.items() if n != name}
+            if isinstance(removed, SQLiteUserStore):
+                removed.close()
+                for suffix in ("", "-wal", "-shm"):
+                    if os.path.exists(removed.path + suffix):
+                        os.remove(removed.path + suffix)
+            return len(users)
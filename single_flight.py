@@ -0,0 +1,68 @@
+"""
+Request coalescing (single-flight) for identical concurrent calls.
+
+The first caller for a key runs the function; callers that arrive with the
+same key while it is still running wait for that result instead of
+computing their own copy.
+"""
+
+import threading
+
+
+class _Call:
+    """One in-flight computation shared by every caller with the same key."""
+
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Deduplicate concurrent calls that share a key."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        """Run fn() once per key among concurrent callers.
+
+        Returns a (result, shared) tuple; shared is True when the result was
+        produced by another caller's computation.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            # Forget the key before waking followers so that a request
+            # arriving after this point computes fresh data.
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, call.waiters > 0
+
+    def in_flight(self):
+        """Number of keys currently being computed."""
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,355 @@
+"""
+Shared-memory read snapshot of the user table.
+
+One writer process publishes the table into an mmap'd file (put it on
+/dev/shm to keep it in RAM); every worker maps the same file read-only and
+serves reads from it without locks or a private copy of the data.
+
+Layout: a 64-byte header followed by two equally sized slots.  The writer
+always fills the slot readers are *not* using, then flips `active`.  The
+header's `seq` counter is bumped before and after each publish, so a reader
+that sees the same `seq` before and after its read knows no flip happened
+in between and its data is complete.  A restarted writer reuses the file
+in place, with its size, layout and `seq` count, so readers that have it
+mapped are unaffected.
+
+Each slot holds a record count, an id-sorted index of
+(id, offset | length << 32, created_at, domain code) entries, the users
+pre-encoded as compact JSON objects, and the JSON list of domains the
+codes refer to.  The index doubles as a NumPy structured array, so domain
+filters and stats are answered from the shared columns too.
+
+Readers open the file on first use, so they may start before the writer;
+until it has published, reads raise SnapshotUnavailable.
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+
+import numpy as np
+
+from columnar import count_buckets, count_domains
+from models import email_domain
+
+MAGIC = b"USERSNP2"
+# magic, seq, active, length[2], version[2], slot size
+_HEADER = struct.Struct("<8sQI4xQQQQQ")
+_HEADER_SIZE = 64
+_SEQ = struct.Struct("<Q")
+_SEQ_OFFSET = 8
+_SLOT_HEADER = struct.Struct("<QQQ")     # record count, domains offset, domains length
+_ENTRY = struct.Struct("<qQqi4x")       # id, offset | length << 32, created_at, domain code
+_ENTRIES = np.dtype({"names": ["id", "created_at", "domain"], "formats": ["<i8", "<i8", "<i4"],
+                     "offsets": [0, 16, 24], "itemsize": _ENTRY.size})
+_ID = struct.Struct("<q")
+
+logger = logging.getLogger(__name__)
+
+
+def encode_user(user):
+    """Compact JSON for one user, matching jsonify's key order."""
+    return json.dumps(user.to_dict(), separators=(",", ":"), sort_keys=True).encode("utf-8")
+
+
+def page_body(records, **fields):
+    """A JSON object body {"data": [records...], **fields} built from
+    pre-encoded records without decoding them."""
+    rest = json.dumps(fields, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return b'{"data":[' + b",".join(records) + b"]" + (b"," + rest[1:] if fields else b"}")
+
+
+class SnapshotUnavailable(RuntimeError):
+    """No snapshot has been published at the path yet."""
+
+
+class SnapshotWriter:
+    """Creates (or reopens) the snapshot file and publishes new versions into it.
+
+    An existing snapshot is reused as it is, never truncated: it keeps its
+    size (`size` only applies to a new file) and its `seq` carries on from
+    where the last writer left it.
+    """
+
+    def __init__(self, path, size=64 * 2**20):
+        self.path = path
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            header = os.pread(fd, _HEADER_SIZE, 0)
+            reused = len(header) == _HEADER_SIZE and header[:len(MAGIC)] == MAGIC
+            if reused:
+                size = os.fstat(fd).st_size
+            else:
+                # Growing is safe even if some process has the file mapped
+                os.ftruncate(fd, max(size, os.fstat(fd).st_size))
+            self._mm = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        if reused:
+            self.slot_size = _HEADER.unpack_from(self._mm, 0)[-1]
+        else:
+            self.slot_size = (size - _HEADER_SIZE) // 2
+            _HEADER.pack_into(self._mm, 0, MAGIC, 0, 0, 0, 0, 0, 0, self.slot_size)
+
+    def _slot_offset(self, slot):
+        return _HEADER_SIZE + slot * self.slot_size
+
+    def publish(self, users, version):
+        """Write users (in id order) as the new snapshot version."""
+        codes = {}
+        rows = []
+        for user in users:
+            code = codes.setdefault(email_domain(user.email), len(codes))
+            rows.append((user.id, user.created_at, code, encode_user(user)))
+        domains = json.dumps(list(codes), separators=(",", ":")).encode("utf-8")
+        index_size = _SLOT_HEADER.size + _ENTRY.size * len(rows)
+        domains_offset = index_size + sum(len(row[3]) for row in rows)
+        length = domains_offset + len(domains)
+        if length > self.slot_size:
+            raise ValueError(f"snapshot needs {length} bytes but a slot holds {self.slot_size}")
+
+        mm = self._mm
+        seq, = _SEQ.unpack_from(mm, _SEQ_OFFSET)
+        _SEQ.pack_into(mm, _SEQ_OFFSET, seq + 1)
+
+        _, _, active, *lengths_versions, _ = _HEADER.unpack_from(mm, 0)
+        slot = 1 - active
+        base = self._slot_offset(slot)
+        _SLOT_HEADER.pack_into(mm, base, len(rows), domains_offset, len(domains))
+        entry = base + _SLOT_HEADER.size
+        offset = base + index_size
+        for user_id, created_at, code, record in rows:
+            _ENTRY.pack_into(mm, entry, user_id, (offset - base) | len(record) << 32, created_at, code)
+            mm[offset:offset + len(record)] = record
+            entry += _ENTRY.size
+            offset += len(record)
+        mm[offset:offset + len(domains)] = domains
+
+        lengths = lengths_versions[:2]
+        versions = lengths_versions[2:]
+        lengths[slot] = length
+        versions[slot] = version
+        _HEADER.pack_into(mm, 0, MAGIC, seq + 1, slot, *lengths, *versions, self.slot_size)
+        _SEQ.pack_into(mm, _SEQ_OFFSET, seq + 2)
+
+    def close(self, unlink=False):
+        self._mm.close()
+        if unlink:
+            os.unlink(self.path)
+
+
+class SnapshotReader:
+    """Lock-free reads of a published snapshot; safe in any process.
+
+    The file is mapped on the first read rather than here, and mapping is
+    retried on every read until the writer has published.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._mm = None
+        self._open_lock = threading.Lock()
+
+    def _map(self):
+        with self._open_lock:
+            if self._mm is not None:
+                return self._mm
+            try:
+                with open(self.path, "rb") as f:
+                    mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (FileNotFoundError, ValueError):
+                # Missing, or created but still empty
+                raise SnapshotUnavailable(f"no user snapshot at {self.path} yet") from None
+            if len(mm) < _HEADER_SIZE or mm[:len(MAGIC)] != MAGIC:
+                mm.close()
+                raise SnapshotUnavailable(f"no user snapshot at {self.path} yet")
+            self._mm = mm
+            return mm
+
+    def _read(self, fn):
+        """Run fn(mm, base, count, version) on the active slot until it is consistent."""
+        mm = self._mm or self._map()
+        while True:
+            seq, = _SEQ.unpack_from(mm, _SEQ_OFFSET)
+            if seq == 0:
+                raise SnapshotUnavailable(f"no user snapshot at {self.path} yet")
+            _, _, active, len0, len1, ver0, ver1, slot_size = _HEADER.unpack_from(mm, 0)
+            base = _HEADER_SIZE + active * slot_size
+            try:
+                count, _, _ = _SLOT_HEADER.unpack_from(mm, base)
+                result = fn(mm, base, count, (ver0, ver1)[active])
+            except (struct.error, ValueError, IndexError):
+                # Torn read from a slot being rewritten; seq has moved on
+                if _SEQ.unpack_from(mm, _SEQ_OFFSET)[0] == seq:
+                    raise
+                continue
+            if _SEQ.unpack_from(mm, _SEQ_OFFSET)[0] == seq:
+                return result
+
+    @staticmethod
+    def _entry(mm, base, i):
+        return _ENTRY.unpack_from(mm, base + _SLOT_HEADER.size + i * _ENTRY.size)
+
+    @staticmethod
+    def _record(mm, base, i):
+        packed = SnapshotReader._entry(mm, base, i)[1]
+        start = base + (packed & 0xFFFFFFFF)
+        return mm[start:start + (packed >> 32)]
+
+    @staticmethod
+    def _bisect(mm, base, count, user_id):
+        """First index whose id is > user_id."""
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if _ID.unpack_from(mm, base + _SLOT_HEADER.size + mid * _ENTRY.size)[0] <= user_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    @staticmethod
+    def _columns(mm, base, count):
+        """The slot's index as a NumPy structured array (a view, not a copy)."""
+        return np.frombuffer(mm, dtype=_ENTRIES, count=count, offset=base + _SLOT_HEADER.size)
+
+    @staticmethod
+    def _domains(mm, base):
+        _, offset, length = _SLOT_HEADER.unpack_from(mm, base)
+        return json.loads(mm[base + offset:base + offset + length])
+
+    def _matches(self, mm, base, count, domain):
+        """Positions of the users in `domain`, in id order."""
+        domains = self._domains(mm, base)
+        try:
+            code = domains.index(domain.lower())
+        except ValueError:
+            return np.empty(0, dtype=np.intp)
+        return np.flatnonzero(self._columns(mm, base, count)["domain"] == code)
+
+    def count(self, domain=None):
+        if domain is None:
+            return self._read(lambda mm, base, count, version: count)
+        return self._read(lambda mm, base, count, version:
+                          len(self._matches(mm, base, count, domain)))
+
+    def version(self):
+        return self._read(lambda mm, base, count, version: version)
+
+    def get(self, user_id):
+        """The JSON-encoded user, or None."""
+        def read(mm, base, count, version):
+            i = self._bisect(mm, base, count, user_id) - 1
+            if i >= 0 and self._entry(mm, base, i)[0] == user_id:
+                return self._record(mm, base, i)
+            return None
+        return self._read(read)
+
+    def get_many(self, user_ids):
+        """JSON-encoded users (or None) for each id, from one consistent version."""
+        def read(mm, base, count, version):
+            records = []
+            for user_id in user_ids:
+                i = self._bisect(mm, base, count, user_id) - 1
+                found = i >= 0 and self._entry(mm, base, i)[0] == user_id
+                records.append(self._record(mm, base, i) if found else None)
+            return records
+        return self._read(read)
+
+    def page(self, start, end, domain=None):
+        """(records, total, version) for positions [start:end] in id order,
+        optionally within one email domain."""
+        def read(mm, base, count, version):
+            if domain is None:
+                positions = range(count)
+            else:
+                positions = self._matches(mm, base, count, domain).tolist()
+            return ([self._record(mm, base, i) for i in positions[start:end]],
+                    len(positions), version)
+        return self._read(read)
+
+    def page_after(self, after_id, limit, domain=None):
+        """(records, last id, total, version) for up to `limit` ids > after_id,
+        optionally within one email domain."""
+        def read(mm, base, count, version):
+            take = max(limit, 0)
+            if domain is None:
+                first = self._bisect(mm, base, count, after_id)
+                positions = range(first, min(first + take, count))
+                total = count
+            else:
+                matches = self._matches(mm, base, count, domain)
+                ids = self._columns(mm, base, count)["id"][matches]
+                # Keep the cursor within int64 for searchsorted
+                cursor = min(max(after_id, -2**63), 2**63 - 1)
+                first = int(np.searchsorted(ids, cursor, side="right"))
+                positions = matches[first:first + take].tolist()
+                total = len(matches)
+            records = [self._record(mm, base, i) for i in positions]
+            last_id = self._entry(mm, base, positions[-1])[0] if records else None
+            return records, last_id, total, version
+        return self._read(read)
+
+    def stats(self, bucket_seconds, since=None, top=None):
+        """Aggregate counts: total, per email domain and per time bucket."""
+        def read(mm, base, count, version):
+            columns = self._columns(mm, base, count)
+            codes, created = columns["domain"], columns["created_at"]
+            if since is not None:
+                recent = created >= since
+                return codes[recent], created[recent], self._domains(mm, base)
+            return codes.copy(), created.copy(), self._domains(mm, base)
+
+        # Aggregate only once the copied columns are known to be consistent
+        codes, created, domains = self._read(read)
+        return {
+            "total": len(codes),
+            "domains": count_domains(codes, domains, top),
+            "histogram": count_buckets(created, bucket_seconds)
+        }
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+
+
+class SnapshotPublisher:
+    """Background thread that republishes a store whenever it changes.
+
+    Writes call notify(); bursts are coalesced so the table is copied at
+    most once per `interval` seconds.
+    """
+
+    def __init__(self, store, writer, interval=0.05):
+        self.store = store
+        self.writer = writer
+        self.interval = interval
+        self._wake = threading.Event()
+        self._published = None
+        self.publish()
+        self._thread = threading.Thread(target=self._run, name="snapshot-publisher", daemon=True)
+        self._thread.start()
+
+    def notify(self):
+        self._wake.set()
+
+    def publish(self):
+        version = self.store.version()
+        if version == self._published:
+            return
+        try:
+            self.writer.publish(self.store.page(0, None), version)
+            self._published = version
+        except ValueError:
+            logger.exception("snapshot publish failed; readers keep version %s", self._published)
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            self.publish()
+            time.sleep(self.interval)
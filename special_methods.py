@@ -2,30 +2,43 @@
 Comprehensive Python Class with All Special Methods
 """
 
+import logging
+import numbers
+import pickle
+import struct
 
-class SpecialMethods:
-    """A class demonstrating all Python special (magic) methods."""
-    
-    # ============================================
-    # Object Creation and Initialization
-    # ============================================
-    
-    def __new__(cls, *args, **kwargs):
-        """Create a new instance of the class."""
-        print(f"__new__ called for {cls}")
-        instance = super().__new__(cls)
-        return instance
+# Binary record layout (little-endian, no padding):
+#   value kind (b'i' int64 / b'f' float64), data kind (b'i' / b'f'),
+#   value (8 bytes), name length (uint32), data count (uint32),
+#   then the UTF-8 name and `count` 8-byte data items.
+_RECORDS = {b'i': struct.Struct('<ccqII'), b'f': struct.Struct('<ccdII')}
+_RECORD_SIZE = _RECORDS[b'i'].size
+_COUNT = struct.Struct('<I')
+
+
+class DecodeError(ValueError):
+    """Raised for truncated or malformed binary records."""
+
+
+def _operand(other):
+    """The raw value to combine with, or NotImplemented for types the
+    operators don't handle, so Python tries the other operand's reflected
+    method (e.g. SpecialMethodsArray broadcasting element-wise)."""
+    if isinstance(other, SpecialMethodsOperators):
+        return other.value
+    if isinstance(other, numbers.Number):
+        return other
+    return NotImplemented
+
+
+class SpecialMethodsOperators:
+    """Operators, conversions, container and serialization methods.
     
-    def __init__(self, value=0, name="Object"):
-        """Initialize the instance."""
-        print(f"__init__ called")
-        self.value = value
-        self.name = name
-        self.data = []
+    They only use the `value`, `name` and `data` attributes, so both
+    SpecialMethods and the fully slotted FastSpecialMethods share them.
+    """
     
-    def __del__(self):
-        """Destructor called when instance is about to be destroyed."""
-        print(f"__del__ called for {self.name}")
+    __slots__ = ()
     
     # ============================================
     # String Representation
@@ -33,15 +46,15 @@ class SpecialMethods:
     
     def __repr__(self):
         """Official string representation for debugging."""
-        return f"SpecialMethods(value={self.value}, name='{self.name}')"
+        return f"{type(self).__name__}(value={self.value}, name='{self.name}')"
     
     def __str__(self):
         """Informal string representation for end users."""
         return f"{self.name}: {self.value}"
     
     def __bytes__(self):
-        """Convert to bytes."""
-        return str(self).encode('utf-8')
+        """Convert to bytes (the binary record, see from_bytes)."""
+        return self.to_bytes()
     
     def __format__(self, format_spec):
         """Custom format specification."""
@@ -57,29 +70,43 @@ class SpecialMethods:
     
     def __lt__(self, other):
         """Less than: <"""
-        return self.value < other.value
+        other = _operand(other)
+        if other is NotImplemented:
+            return NotImplemented
+        return self.value < other
     
     def __le__(self, other):
         """Less than or equal: <="""
-        return self.value <= other.value
+        other = _operand(other)
+        if other is NotImplemented:
+            return NotImplemented
+        return self.value <= other
     
     def __eq__(self, other):
         """Equal: =="""
-        if isinstance(other, SpecialMethods):
+        if isinstance(other, SpecialMethodsOperators):
             return self.value == other.value
-        return False
+        # Let the other operand decide (Python falls back to identity)
+        return NotImplemented
     
     def __ne__(self, other):
         """Not equal: !="""
-        return not self.__eq__(other)
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
     
     def __gt__(self, other):
         """Greater than: >"""
-        return self.value > other.value
+        other = _operand(other)
+        if other is NotImplemented:
+            return NotImplemented
+        return self.value > other
     
     def __ge__(self, other):
         """Greater than or equal: >="""
-        return self.value >= other.value
+        other = _operand(other)
+        if other is NotImplemented:
+            return NotImplemented
+        return self.value >= other
     
     def __hash__(self):
         """Make instance hashable (for use in sets/dicts)."""
@@ -95,55 +122,62 @@ class SpecialMethods:
     
     def __add__(self, other):
         """Addition: +"""
-        if isinstance(other, SpecialMethods):
-            return SpecialMethods(self.value + other.value)
-        return SpecialMethods(self.value + other)
+        other = _operand(other)
+        if other is NotImplemented:
+            return NotImplemented
+        return type(self)(self.value + other)
     
     def __sub__(self, other):
         """Subtraction: -"""
-        if isinstance(other, SpecialMethods):
-            return SpecialMethods(self.value - other.value)
-        return SpecialMethods(self.value - other)
+        other = _operand(other)
+        if other is NotImplemented:
+            return NotImplemented
+        return type(self)(self.value - other)
     
     def __mul__(self, other):
         """Multiplication: *"""
-        if isinstance(other, SpecialMethods):
-            return SpecialMethods(self.value * other.value)
-        return SpecialMethods(self.value * other)
+        other = _operand(other)
+        if other is NotImplemented:
+            return NotImplemented
+        return type(self)(self.value * other)
     
     def __truediv__(self, other):
         """True division: /"""
-        if isinstance(other, SpecialMethods):
-            return SpecialMethods(self.value / other.value)
-        return SpecialMethods(self.value / other)
+        other = _operand(other)
+        if other is NotImplemented:
+            return NotImplemented
+        return type(self)(self.value / other)
     
     def __floordiv__(self, other):
         """Floor division: //"""
-        if isinstance(other, SpecialMethods):
-            return SpecialMethods(self.value // other.value)
-        return SpecialMethods(self.value // other)
+        other = _operand(other)
+        if other is NotImplemented:
+            return NotImplemented
+        return type(self)(self.value // other)
     
     def __mod__(self, other):
         """Modulo: %"""
-        if isinstance(other, SpecialMethods):
-            return SpecialMethods(self.value % other.value)
-        return SpecialMethods(self.value % other)
+        other = _operand(other)
+        if other is NotImplemented:
+            return NotImplemented
+        return type(self)(self.value % other)
     
     def __divmod__(self, other):
         """Divmod function."""
-        if isinstance(other, SpecialMethods):
-            return divmod(self.value, other.value)
+        other = _operand(other)
+        if other is NotImplemented:
+            return NotImplemented
         return divmod(self.value, other)
     
     def __pow__(self, other, modulo=None):
         """Power: **"""
-        if isinstance(other, SpecialMethods):
-            result = self.value ** other.value
-        else:
-            result = self.value ** other
+        other = _operand(other)
+        if other is NotImplemented:
+            return NotImplemented
+        result = self.value ** other
         if modulo:
             result %= modulo
-        return SpecialMethods(result)
+        return type(self)(result)
     
     # ============================================
     # Reflected (Right) Arithmetic Operators
@@ -151,31 +185,45 @@ class SpecialMethods:
     
     def __radd__(self, other):
         """Reflected addition."""
-        return SpecialMethods(other + self.value)
+        if _operand(other) is NotImplemented:
+            return NotImplemented
+        return type(self)(other + self.value)
     
     def __rsub__(self, other):
         """Reflected subtraction."""
-        return SpecialMethods(other - self.value)
+        if _operand(other) is NotImplemented:
+            return NotImplemented
+        return type(self)(other - self.value)
     
     def __rmul__(self, other):
         """Reflected multiplication."""
-        return SpecialMethods(other * self.value)
+        if _operand(other) is NotImplemented:
+            return NotImplemented
+        return type(self)(other * self.value)
     
     def __rtruediv__(self, other):
         """Reflected true division."""
-        return SpecialMethods(other / self.value)
+        if _operand(other) is NotImplemented:
+            return NotImplemented
+        return type(self)(other / self.value)
     
     def __rfloordiv__(self, other):
         """Reflected floor division."""
-        return SpecialMethods(other // self.value)
+        if _operand(other) is NotImplemented:
+            return NotImplemented
+        return type(self)(other // self.value)
     
     def __rmod__(self, other):
         """Reflected modulo."""
-        return SpecialMethods(other % self.value)
+        if _operand(other) is NotImplemented:
+            return NotImplemented
+        return type(self)(other % self.value)
     
     def __rpow__(self, other):
         """Reflected power."""
-        return SpecialMethods(other ** self.value)
+        if _operand(other) is NotImplemented:
+            return NotImplemented
+        return type(self)(other ** self.value)
     
     # ============================================
     # Augmented Assignment
@@ -183,58 +231,58 @@ class SpecialMethods:
     
     def __iadd__(self, other):
         """In-place addition: +="""
-        if isinstance(other, SpecialMethods):
-            self.value += other.value
-        else:
-            self.value += other
+        other = _operand(other)
+        if other is NotImplemented:
+            return NotImplemented
+        self.value += other
         return self
     
     def __isub__(self, other):
         """In-place subtraction: -="""
-        if isinstance(other, SpecialMethods):
-            self.value -= other.value
-        else:
-            self.value -= other
+        other = _operand(other)
+        if other is NotImplemented:
+            return NotImplemented
+        self.value -= other
         return self
     
     def __imul__(self, other):
         """In-place multiplication: *="""
-        if isinstance(other, SpecialMethods):
-            self.value *= other.value
-        else:
-            self.value *= other
+        other = _operand(other)
+        if other is NotImplemented:
+            return NotImplemented
+        self.value *= other
         return self
     
     def __itruediv__(self, other):
         """In-place true division: /="""
-        if isinstance(other, SpecialMethods):
-            self.value /= other.value
-        else:
-            self.value /= other
+        other = _operand(other)
+        if other is NotImplemented:
+            return NotImplemented
+        self.value /= other
         return self
     
     def __ifloordiv__(self, other):
         """In-place floor division: //="""
-        if isinstance(other, SpecialMethods):
-            self.value //= other.value
-        else:
-            self.value //= other
+        other = _operand(other)
+        if other is NotImplemented:
+            return NotImplemented
+        self.value //= other
         return self
     
     def __imod__(self, other):
         """In-place modulo: %="""
-        if isinstance(other, SpecialMethods):
-            self.value %= other.value
-        else:
-            self.value %= other
+        other = _operand(other)
+        if other is NotImplemented:
+            return NotImplemented
+        self.value %= other
         return self
     
     def __ipow__(self, other):
         """In-place power: **="""
-        if isinstance(other, SpecialMethods):
-            self.value **= other.value
-        else:
-            self.value **= other
+        other = _operand(other)
+        if other is NotImplemented:
+            return NotImplemented
+        self.value **= other
         return self
     
     # ============================================
@@ -243,19 +291,19 @@ class SpecialMethods:
     
     def __neg__(self):
         """Unary negative: -obj"""
-        return SpecialMethods(-self.value)
+        return type(self)(-self.value)
     
     def __pos__(self):
         """Unary positive: +obj"""
-        return SpecialMethods(+self.value)
+        return type(self)(+self.value)
     
     def __abs__(self):
         """Absolute value: abs(obj)"""
-        return SpecialMethods(abs(self.value))
+        return type(self)(abs(self.value))
     
     def __invert__(self):
         """Bitwise inversion: ~obj"""
-        return SpecialMethods(~int(self.value))
+        return type(self)(~int(self.value))
     
     # ============================================
     # Type Conversion
@@ -302,94 +350,109 @@ class SpecialMethods:
     
     def __and__(self, other):
         """Bitwise AND: &"""
-        if isinstance(other, SpecialMethods):
-            return SpecialMethods(int(self.value) & int(other.value))
-        return SpecialMethods(int(self.value) & int(other))
+        other = _operand(other)
+        if other is NotImplemented:
+            return NotImplemented
+        return type(self)(int(self.value) & int(other))
     
     def __or__(self, other):
         """Bitwise OR: |"""
-        if isinstance(other, SpecialMethods):
-            return SpecialMethods(int(self.value) | int(other.value))
-        return SpecialMethods(int(self.value) | int(other))
+        other = _operand(other)
+        if other is NotImplemented:
+            return NotImplemented
+        return type(self)(int(self.value) | int(other))
     
     def __xor__(self, other):
         """Bitwise XOR: ^"""
-        if isinstance(other, SpecialMethods):
-            return SpecialMethods(int(self.value) ^ int(other.value))
-        return SpecialMethods(int(self.value) ^ int(other))
+        other = _operand(other)
+        if other is NotImplemented:
+            return NotImplemented
+        return type(self)(int(self.value) ^ int(other))
     
     def __lshift__(self, other):
         """Left shift: <<"""
-        if isinstance(other, SpecialMethods):
-            return SpecialMethods(int(self.value) << int(other.value))
-        return SpecialMethods(int(self.value) << int(other))
+        other = _operand(other)
+        if other is NotImplemented:
+            return NotImplemented
+        return type(self)(int(self.value) << int(other))
     
     def __rshift__(self, other):
         """Right shift: >>"""
-        if isinstance(other, SpecialMethods):
-            return SpecialMethods(int(self.value) >> int(other.value))
-        return SpecialMethods(int(self.value) >> int(other))
+        other = _operand(other)
+        if other is NotImplemented:
+            return NotImplemented
+        return type(self)(int(self.value) >> int(other))
     
     # Reflected bitwise operators
     def __rand__(self, other):
         """Reflected AND."""
-        return SpecialMethods(int(other) & int(self.value))
+        if _operand(other) is NotImplemented:
+            return NotImplemented
+        return type(self)(int(other) & int(self.value))
     
     def __ror__(self, other):
         """Reflected OR."""
-        return SpecialMethods(int(other) | int(self.value))
+        if _operand(other) is NotImplemented:
+            return NotImplemented
+        return type(self)(int(other) | int(self.value))
     
     def __rxor__(self, other):
         """Reflected XOR."""
-        return SpecialMethods(int(other) ^ int(self.value))
+        if _operand(other) is NotImplemented:
+            return NotImplemented
+        return type(self)(int(other) ^ int(self.value))
     
     def __rlshift__(self, other):
         """Reflected left shift."""
-        return SpecialMethods(int(other) << int(self.value))
+        if _operand(other) is NotImplemented:
+            return NotImplemented
+        return type(self)(int(other) << int(self.value))
     
     def __rrshift__(self, other):
         """Reflected right shift."""
-        return SpecialMethods(int(other) >> int(self.value))
+        if _operand(other) is NotImplemented:
+            return NotImplemented
+        return type(self)(int(other) >> int(self.value))
     
     # In-place bitwise operators
     def __iand__(self, other):
         """In-place AND: &="""
-        if isinstance(other, SpecialMethods):
-            self.value = int(self.value) & int(other.value)
-        else:
-            self.value = int(self.value) & int(other)
+        other = _operand(other)
+        if other is NotImplemented:
+            return NotImplemented
+        self.value = int(self.value) & int(other)
         return self
     
     def __ior__(self, other):
         """In-place OR: |="""
-        if isinstance(other, SpecialMethods):
-            self.value = int(self.value) | int(other.value)
-        else:
-            self.value = int(self.value) | int(other)
+        other = _operand(other)
+        if other is NotImplemented:
+            return NotImplemented
+        self.value = int(self.value) | int(other)
         return self
     
     def __ixor__(self, other):
         """In-place XOR: ^="""
-        if isinstance(other, SpecialMethods):
-            self.value = int(self.value) ^ int(other.value)
-        else:
-            self.value = int(self.value) ^ int(other)
+        other = _operand(other)
+        if other is NotImplemented:
+            return NotImplemented
+        self.value = int(self.value) ^ int(other)
         return self
     
     def __ilshift__(self, other):
         """In-place left shift: <<="""
-        if isinstance(other, SpecialMethods):
-            self.value = int(self.value) << int(other.value)
-        else:
-            self.value = int(self.value) << int(other)
+        other = _operand(other)
+        if other is NotImplemented:
+            return NotImplemented
+        self.value = int(self.value) << int(other)
         return self
     
     def __irshift__(self, other):
         """In-place right shift: >>="""
-        if isinstance(other, SpecialMethods):
-            self.value = int(self.value) >> int(other.value)
-        else:
-            self.value = int(self.value) >> int(other)
+        other = _operand(other)
+        if other is NotImplemented:
+            return NotImplemented
+        self.value = int(self.value) >> int(other)
         return self
     
     # ============================================
@@ -424,6 +487,160 @@ class SpecialMethods:
         """Membership test: item in obj"""
         return item in self.data
     
+    # ============================================
+    # Async Iteration (Python 3.5+)
+    # ============================================
+    
+    def __aiter__(self):
+        """Async iterator: async for x in obj"""
+        return self
+    
+    async def __anext__(self):
+        """Async next item."""
+        if len(self.data) == 0:
+            raise StopAsyncIteration
+        return self.data.pop(0)
+    
+    # ============================================
+    # Pickling/Copying
+    # ============================================
+    
+    def __getstate__(self):
+        """Get state for pickling."""
+        return {'value': self.value, 'name': self.name, 'data': self.data}
+    
+    def __setstate__(self, state):
+        """Set state from unpickling."""
+        self.value = state['value']
+        self.name = state['name']
+        self.data = state['data']
+    
+    def __reduce__(self):
+        """Reduce for pickling (restores data without re-running __init__)."""
+        return (_restore, (self.__class__,), self.__getstate__())
+    
+    def __reduce_ex__(self, protocol):
+        """Extended reduce for pickling: protocol 5 ships the binary record
+        as an out-of-band capable PickleBuffer."""
+        if protocol >= 5:
+            try:
+                record = pickle.PickleBuffer(self.to_bytes())
+            except (TypeError, OverflowError):
+                return self.__reduce__()
+            return (_restore_record, (self.__class__, record))
+        return self.__reduce__()
+    
+    # ============================================
+    # Binary Serialization
+    # ============================================
+    
+    def _record_parts(self):
+        """Validate and return (struct, value kind, data kind, name bytes)."""
+        value_kind = _kind_of(self.value, 'value')
+        data = self.data
+        data_kind = b'i'
+        if len(data):
+            kinds = {_kind_of(item, 'data items') for item in data}
+            if len(kinds) > 1:
+                raise TypeError("data items must be all int or all float")
+            data_kind = kinds.pop()
+        return _RECORDS[value_kind], value_kind, data_kind, self.name.encode('utf-8')
+    
+    def _pack_into(self, buffer, offset):
+        """Write the binary record at offset; returns the offset after it."""
+        record, value_kind, data_kind, name = self._record_parts()
+        count = len(self.data)
+        try:
+            record.pack_into(buffer, offset, value_kind, data_kind, self.value, len(name), count)
+            offset += _RECORD_SIZE
+            buffer[offset:offset + len(name)] = name
+            offset += len(name)
+            if count:
+                struct.pack_into(f'<{count}{"q" if data_kind == b"i" else "d"}',
+                                 buffer, offset, *self.data)
+        except struct.error as exc:
+            raise OverflowError(f"value does not fit the binary layout: {exc}") from None
+        return offset + 8 * count
+    
+    def record_size(self):
+        """Size in bytes of the binary record."""
+        return _RECORD_SIZE + len(self.name.encode('utf-8')) + 8 * len(self.data)
+    
+    def to_bytes(self):
+        """Encode as a fixed-layout binary record (value, name and data).
+        
+        value and data items must be int (64-bit) or float, and data items
+        must all share one of those types.
+        """
+        buffer = bytearray(self.record_size())
+        self._pack_into(buffer, 0)
+        return bytes(buffer)
+    
+    @classmethod
+    def from_bytes(cls, buffer, copy=True):
+        """Decode a record produced by to_bytes() without calling __init__.
+        
+        Raises DecodeError (a ValueError) for truncated or malformed input,
+        including trailing bytes after the record.
+        """
+        view = memoryview(buffer)
+        obj, end = _unpack_from(cls, view, 0, copy)
+        if end != len(view):
+            raise DecodeError(f"{len(view) - end} bytes of trailing data after the record")
+        return obj
+    
+    def __copy__(self):
+        """Shallow copy: copy.copy(obj)"""
+        return type(self)(self.value, self.name)
+    
+    def __deepcopy__(self, memo):
+        """Deep copy: copy.deepcopy(obj)"""
+        import copy
+        return type(self)(copy.deepcopy(self.value, memo), 
+                            copy.deepcopy(self.name, memo))
+    
+    # ============================================
+    # Other Special Methods
+    # ============================================
+    
+    def __sizeof__(self):
+        """Return size in memory."""
+        import sys
+        return sys.getsizeof(self.value) + sys.getsizeof(self.name)
+    
+    # ============================================
+    # Class Methods
+    # ============================================
+    
+    def __class_getitem__(cls, item):
+        """Support for generic types: Class[Type]"""
+        return f"{cls.__name__}[{item}]"
+
+
+class SpecialMethods(SpecialMethodsOperators):
+    """A class demonstrating all Python special (magic) methods."""
+    
+    # ============================================
+    # Object Creation and Initialization
+    # ============================================
+    
+    def __new__(cls, *args, **kwargs):
+        """Create a new instance of the class."""
+        print(f"__new__ called for {cls}")
+        instance = super().__new__(cls)
+        return instance
+    
+    def __init__(self, value=0, name="Object"):
+        """Initialize the instance."""
+        print(f"__init__ called")
+        self.value = value
+        self.name = name
+        self.data = []
+    
+    def __del__(self):
+        """Destructor called when instance is about to be destroyed."""
+        print(f"__del__ called for {self.name}")
+    
     # ============================================
     # Attribute Access
     # ============================================
@@ -487,20 +704,6 @@ class SpecialMethods:
         print(f"Async exiting context for {self.name}")
         return False
     
-    # ============================================
-    # Async Iteration (Python 3.5+)
-    # ============================================
-    
-    def __aiter__(self):
-        """Async iterator: async for x in obj"""
-        return self
-    
-    async def __anext__(self):
-        """Async next item."""
-        if len(self.data) == 0:
-            raise StopAsyncIteration
-        return self.data.pop(0)
-    
     # ============================================
     # Descriptor Protocol
     # ============================================
@@ -523,47 +726,10 @@ class SpecialMethods:
         """Set descriptor name (Python 3.6+)."""
         print(f"__set_name__ called: owner={owner}, name={name}")
     
-    # ============================================
-    # Pickling/Copying
-    # ============================================
-    
-    def __getstate__(self):
-        """Get state for pickling."""
-        return {'value': self.value, 'name': self.name, 'data': self.data}
-    
-    def __setstate__(self, state):
-        """Set state from unpickling."""
-        self.value = state['value']
-        self.name = state['name']
-        self.data = state['data']
-    
-    def __reduce__(self):
-        """Reduce for pickling."""
-        return (self.__class__, (self.value, self.name))
-    
-    def __reduce_ex__(self, protocol):
-        """Extended reduce for pickling."""
-        return self.__reduce__()
-    
-    def __copy__(self):
-        """Shallow copy: copy.copy(obj)"""
-        return SpecialMethods(self.value, self.name)
-    
-    def __deepcopy__(self, memo):
-        """Deep copy: copy.deepcopy(obj)"""
-        import copy
-        return SpecialMethods(copy.deepcopy(self.value, memo), 
-                            copy.deepcopy(self.name, memo))
-    
     # ============================================
     # Other Special Methods
     # ============================================
     
-    def __sizeof__(self):
-        """Return size in memory."""
-        import sys
-        return sys.getsizeof(self.value) + sys.getsizeof(self.name)
-    
     def __instancecheck__(self, instance):
         """Custom isinstance() behavior."""
         return isinstance(instance, SpecialMethods)
@@ -576,14 +742,222 @@ class SpecialMethods:
     # Class Methods
     # ============================================
     
-    def __init_subclass__(cls, **kwargs):
-        """Called when class is subclassed."""
+    def __init_subclass__(cls, silent=False, **kwargs):
+        """Called when class is subclassed: class Sub(SpecialMethods, silent=True)"""
         super().__init_subclass__(**kwargs)
-        print(f"Subclass {cls.__name__} created")
+        if not silent:
+            print(f"Subclass {cls.__name__} created")
+
+
+def _kind_of(item, what):
+    if type(item) is int:
+        return b'i'
+    if type(item) is float:
+        return b'f'
+    raise TypeError(f"{what} must be int or float for binary encoding, "
+                    f"not {type(item).__name__}")
+
+
+def _restore(cls):
+    """Create an instance for unpickling without the noisy constructor."""
+    return object.__new__(cls)
+
+
+def _restore_record(cls, record):
+    return cls.from_bytes(record)
+
+
+def _unpack_from(cls, view, offset, copy):
+    """Decode one record from a memoryview; returns (object, next offset).
+    
+    With copy=False, `data` is a read-only memoryview into the buffer
+    rather than a list.  Raises DecodeError if the record is truncated or
+    its kind bytes are invalid.
+    """
+    if offset + _RECORD_SIZE > len(view):
+        raise DecodeError(f"truncated record header at offset {offset}")
+    record = _RECORDS.get(bytes(view[offset:offset + 1]))
+    if record is None:
+        raise DecodeError(f"invalid value kind {bytes(view[offset:offset + 1])!r} at offset {offset}")
+    value_kind, data_kind, value, name_length, count = record.unpack_from(view, offset)
+    if data_kind not in _RECORDS:
+        raise DecodeError(f"invalid data kind {data_kind!r} at offset {offset}")
+    offset += _RECORD_SIZE
+    end = offset + name_length + 8 * count
+    if end > len(view):
+        raise DecodeError(f"record needs {end} bytes but the buffer has {len(view)}")
+    try:
+        name = str(view[offset:offset + name_length], 'utf-8')
+    except UnicodeDecodeError as exc:
+        raise DecodeError(f"name is not valid UTF-8: {exc}") from None
+    offset += name_length
+    data = view[offset:end].cast('q' if data_kind == b'i' else 'd')
+    offset = end
+    obj = object.__new__(cls)
+    obj.value = value
+    obj.name = name
+    obj.data = data.tolist() if copy else data.toreadonly()
+    return obj, offset
+
+
+def encode_batch(objects):
+    """Encode many objects into one buffer: a uint32 count, then records.
+    
+    The buffer is sized up front and every record is packed in place.
+    """
+    objects = list(objects)
+    buffer = bytearray(_COUNT.size + sum(obj.record_size() for obj in objects))
+    _COUNT.pack_into(buffer, 0, len(objects))
+    offset = _COUNT.size
+    for obj in objects:
+        offset = obj._pack_into(buffer, offset)
+    return buffer
+
+
+def iter_decode(buffer, cls=SpecialMethods, copy=True):
+    """Yield objects from an encode_batch() buffer, one at a time.
+    
+    Raises DecodeError for a truncated or malformed buffer.
+    """
+    view = memoryview(buffer)
+    if len(view) < _COUNT.size:
+        raise DecodeError("truncated batch header")
+    count, = _COUNT.unpack_from(view, 0)
+    offset = _COUNT.size
+    for _ in range(count):
+        obj, offset = _unpack_from(cls, view, offset, copy)
+        yield obj
+    if offset != len(view):
+        raise DecodeError(f"{len(view) - offset} bytes of trailing data after {count} records")
+
+
+def decode_batch(buffer, cls=SpecialMethods, copy=True):
+    """Decode an encode_batch() buffer into a list of objects.
     
-    def __class_getitem__(cls, item):
-        """Support for generic types: Class[Type]"""
-        return f"{cls.__name__}[{item}]"
+    Records are read through a memoryview, so nothing is sliced out of the
+    buffer; with copy=False each object's data stays a view into it.
+    """
+    return list(iter_decode(buffer, cls, copy))
+
+
+class EncodedBatch:
+    """A batch of binary records that pickles its buffer out-of-band.
+    
+    With pickle protocol 5 and a buffer_callback, the records travel as a
+    single PickleBuffer instead of being copied into the pickle stream.
+    """
+    
+    def __init__(self, buffer, cls=SpecialMethods):
+        self.buffer = buffer
+        self.cls = cls
+    
+    @classmethod
+    def from_objects(cls, objects, kind=None):
+        """Encode objects; they decode as `kind` (default: the first object's class)."""
+        objects = list(objects)
+        if kind is None:
+            kind = type(objects[0]) if objects else SpecialMethods
+        return cls(encode_batch(objects), kind)
+    
+    def __len__(self):
+        return _COUNT.unpack_from(self.buffer, 0)[0]
+    
+    def __iter__(self):
+        return iter_decode(self.buffer, self.cls)
+    
+    def decode(self, copy=True):
+        return decode_batch(self.buffer, self.cls, copy)
+    
+    def __reduce_ex__(self, protocol):
+        if protocol >= 5:
+            return (EncodedBatch, (pickle.PickleBuffer(self.buffer), self.cls))
+        return (EncodedBatch, (bytes(self.buffer), self.cls))
+
+
+def dumps_batch(objects, buffer_callback=None):
+    """Pickle objects as one EncodedBatch using protocol 5."""
+    return pickle.dumps(EncodedBatch.from_objects(objects), protocol=5,
+                        buffer_callback=buffer_callback)
+
+
+def loads_batch(data, buffers=None, copy=True):
+    """Inverse of dumps_batch(); returns the list of objects."""
+    return pickle.loads(data, buffers=buffers).decode(copy)
+
+
+class FastSpecialMethods(SpecialMethodsOperators):
+    """Production variant of SpecialMethods.
+
+    It shares SpecialMethods' operators (through SpecialMethodsOperators)
+    but not its printing lifecycle and attribute hooks, so every class in
+    its MRO is slotted: instances have no __dict__, no Python-level
+    __new__ or __del__, and attribute access stays in C.  The `data` list
+    is only allocated when first used.  Call, context and descriptor events
+    go to a pluggable `logger` at DEBUG level instead of print.  Operators
+    return FastSpecialMethods instances.
+    """
+
+    __slots__ = ('value', 'name', 'data')
+
+    # Replace per class or subclass to redirect the events
+    logger = logging.getLogger(__name__)
+
+    def __init__(self, value=0, name="Object"):
+        """Initialize the instance without logging; `data` is created on first use."""
+        self.value = value
+        self.name = name
+
+    def __getattr__(self, name):
+        """Allocate `data` lazily; other missing attributes raise AttributeError."""
+        if name == 'data':
+            self.data = []
+            return self.data
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def __call__(self, *args, **kwargs):
+        """Make instance callable: obj()"""
+        self.logger.debug("Called %s with args=%s, kwargs=%s", self.name, args, kwargs)
+        return self.value
+
+    def __enter__(self):
+        """Enter context: with obj as x"""
+        self.logger.debug("Entering context for %s", self.name)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Exit context."""
+        self.logger.debug("Exiting context for %s", self.name)
+        if exc_type is not None:
+            self.logger.debug("Exception: %s, %s", exc_type, exc_val)
+        return False
+
+    async def __aenter__(self):
+        """Async enter context: async with obj"""
+        self.logger.debug("Async entering context for %s", self.name)
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async exit context."""
+        self.logger.debug("Async exiting context for %s", self.name)
+        return False
+
+    def __get__(self, instance, owner):
+        """Descriptor get."""
+        self.logger.debug("__get__ called")
+        return self
+
+    def __set__(self, instance, value):
+        """Descriptor set."""
+        self.logger.debug("__set__ called with %s", value)
+        self.value = value
+
+    def __delete__(self, instance):
+        """Descriptor delete."""
+        self.logger.debug("__delete__ called")
+
+    def __set_name__(self, owner, name):
+        """Set descriptor name (Python 3.6+)."""
+        self.logger.debug("__set_name__ called: owner=%s, name=%s", owner, name)
 
 
 # ============================================
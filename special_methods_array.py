@@ -0,0 +1,453 @@
+"""
+Vectorized batch companion to SpecialMethods
+"""
+
+import math
+import operator
+
+try:
+    import numpy as np
+except ImportError:  # pure-Python fallback backed by a list
+    np = None
+
+from special_methods import SpecialMethods, SpecialMethodsOperators
+
+
+def _as_operand(other):
+    """Unwrap SpecialMethods / SpecialMethodsArray operands to raw values."""
+    if isinstance(other, SpecialMethodsArray):
+        return other.values
+    if isinstance(other, SpecialMethodsOperators):
+        return other.value
+    return other
+
+
+def _is_sequence(value):
+    return isinstance(value, (list, tuple, range)) or (np is not None and isinstance(value, np.ndarray))
+
+
+def _to_int(values):
+    """Integer view of values, as SpecialMethods does with int() for bitwise ops."""
+    if np is not None and _is_sequence(values):
+        values = np.asarray(values)
+        if values.dtype == object:
+            # Python ints beyond int64 stay exact
+            return np.array([int(v) for v in values], dtype=object)
+        return values.astype(np.int64)
+    if _is_sequence(values):
+        return [int(v) for v in values]
+    return int(values)
+
+
+# Integer operations whose int64 results can wrap, each with a float64
+# estimate used to spot results near the int64 range
+_WRAPPING = {
+    operator.add: operator.add,
+    operator.sub: operator.sub,
+    operator.mul: operator.mul,
+    operator.floordiv: operator.floordiv,
+    operator.pow: operator.pow,
+    operator.lshift: lambda a, b: a * 2.0 ** b,
+}
+_INT64_SAFE = 2.0 ** 62
+
+
+def _objects(value):
+    """Python-int (object dtype) version of a NumPy operand."""
+    if isinstance(value, np.ndarray):
+        return value.astype(object)
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _exact(op, left, right):
+    """op(left, right) with NumPy, redone with Python ints if int64 would wrap."""
+    try:
+        result = op(left, right)
+    except OverflowError:
+        # A Python int operand that does not fit in int64
+        return op(_objects(left), _objects(right))
+    estimate = _WRAPPING.get(op)
+    if estimate is None or np.asarray(result).dtype.kind not in "iu":
+        return result
+    with np.errstate(all="ignore"):
+        approx = estimate(np.asarray(left, dtype=np.float64), np.asarray(right, dtype=np.float64))
+    if np.any(np.abs(approx) >= _INT64_SAFE):
+        return op(_objects(left), _objects(right))
+    return result
+
+
+class SpecialMethodsArray:
+    """Many SpecialMethods values held in one NumPy array (or list).
+
+    Supports the same operator, comparison, bitwise and conversion
+    protocols as SpecialMethods, applied element-wise.  Scalars and
+    SpecialMethods instances broadcast against every element, on either
+    side of the operator.  No per-element objects are created, so nothing
+    is printed.
+
+    Integer maths stays exact, as in SpecialMethods: results that would
+    overflow int64 are computed with Python ints instead (object dtype,
+    which is slower).
+    """
+
+    __slots__ = ("values",)
+
+    def __init__(self, values=()):
+        if isinstance(values, SpecialMethodsArray):
+            values = values.values
+        elif not _is_sequence(values):
+            values = [v.value if isinstance(v, SpecialMethodsOperators) else v for v in values]
+        if np is not None:
+            self.values = np.asarray(values)
+        else:
+            self.values = list(values)
+
+    @classmethod
+    def from_objects(cls, objects):
+        """Build from an iterable of SpecialMethods instances."""
+        return cls([obj.value for obj in objects])
+
+    def to_objects(self, name="Object"):
+        """Materialize one SpecialMethods instance per element."""
+        return [SpecialMethods(value, name) for value in self.tolist()]
+
+    def tolist(self):
+        if np is not None:
+            return self.values.tolist()
+        return list(self.values)
+
+    # ============================================
+    # Element-wise helpers
+    # ============================================
+
+    def _binary(self, op, other, reflected=False):
+        other = _as_operand(other)
+        left, right = (other, self.values) if reflected else (self.values, other)
+        if np is not None:
+            return SpecialMethodsArray(_exact(op, left, right))
+        if _is_sequence(other):
+            if len(other) != len(self.values):
+                raise ValueError(f"operands could not be broadcast together with "
+                                 f"lengths {len(self.values)} and {len(other)}")
+            pairs = zip(other, self.values) if reflected else zip(self.values, other)
+            return SpecialMethodsArray([op(a, b) for a, b in pairs])
+        if reflected:
+            return SpecialMethodsArray([op(other, v) for v in self.values])
+        return SpecialMethodsArray([op(v, other) for v in self.values])
+
+    def _bitwise(self, op, other, reflected=False):
+        return SpecialMethodsArray(_to_int(self.values))._binary(
+            op, _to_int(_as_operand(other)), reflected)
+
+    def _unary(self, op):
+        if np is not None:
+            values = self.values
+            # -(-2**63) and abs(-2**63) do not fit in int64
+            if (op in (operator.neg, abs) and values.dtype == np.int64
+                    and np.any(values == np.iinfo(np.int64).min)):
+                values = values.astype(object)
+            return SpecialMethodsArray(op(values))
+        return SpecialMethodsArray([op(v) for v in self.values])
+
+    def _inplace(self, result):
+        self.values = result.values
+        return self
+
+    # ============================================
+    # String Representation
+    # ============================================
+
+    def __repr__(self):
+        return f"SpecialMethodsArray({self.tolist()!r})"
+
+    def __str__(self):
+        return str(self.tolist())
+
+    # ============================================
+    # Container Methods
+    # ============================================
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return SpecialMethodsArray(self.values[key])
+        return self.values[key]
+
+    def __setitem__(self, key, value):
+        self.values[key] = _as_operand(value)
+
+    def __iter__(self):
+        return iter(self.tolist())
+
+    def __contains__(self, item):
+        return _as_operand(item) in self.values
+
+    def __array__(self, dtype=None, copy=None):
+        """NumPy interop: np.asarray(batch)"""
+        return np.asarray(self.values, dtype=dtype)
+
+    # ============================================
+    # Comparison Operators (element-wise)
+    # ============================================
+
+    def __lt__(self, other):
+        return self._binary(operator.lt, other)
+
+    def __le__(self, other):
+        return self._binary(operator.le, other)
+
+    def __eq__(self, other):
+        return self._binary(operator.eq, other)
+
+    def __ne__(self, other):
+        return self._binary(operator.ne, other)
+
+    def __gt__(self, other):
+        return self._binary(operator.gt, other)
+
+    def __ge__(self, other):
+        return self._binary(operator.ge, other)
+
+    # Element-wise __eq__ makes instances unhashable
+    __hash__ = None
+
+    def __bool__(self):
+        """Truth value of a single-element batch, like NumPy."""
+        if len(self.values) != 1:
+            raise ValueError("the truth value of a SpecialMethodsArray with more than "
+                             "one element is ambiguous; use any() or all()")
+        return bool(self.values[0])
+
+    def any(self):
+        return bool(self.values.any()) if np is not None else any(self.values)
+
+    def all(self):
+        return bool(self.values.all()) if np is not None else all(self.values)
+
+    # ============================================
+    # Arithmetic Operators
+    # ============================================
+
+    def __add__(self, other):
+        return self._binary(operator.add, other)
+
+    def __sub__(self, other):
+        return self._binary(operator.sub, other)
+
+    def __mul__(self, other):
+        return self._binary(operator.mul, other)
+
+    def __truediv__(self, other):
+        return self._binary(operator.truediv, other)
+
+    def __floordiv__(self, other):
+        return self._binary(operator.floordiv, other)
+
+    def __mod__(self, other):
+        return self._binary(operator.mod, other)
+
+    def __divmod__(self, other):
+        return self // other, self % other
+
+    def __pow__(self, other, modulo=None):
+        result = self._binary(operator.pow, other)
+        if modulo:
+            result = result % modulo
+        return result
+
+    # Reflected (Right) Arithmetic Operators
+
+    def __radd__(self, other):
+        return self._binary(operator.add, other, reflected=True)
+
+    def __rsub__(self, other):
+        return self._binary(operator.sub, other, reflected=True)
+
+    def __rmul__(self, other):
+        return self._binary(operator.mul, other, reflected=True)
+
+    def __rtruediv__(self, other):
+        return self._binary(operator.truediv, other, reflected=True)
+
+    def __rfloordiv__(self, other):
+        return self._binary(operator.floordiv, other, reflected=True)
+
+    def __rmod__(self, other):
+        return self._binary(operator.mod, other, reflected=True)
+
+    def __rdivmod__(self, other):
+        return (self._binary(operator.floordiv, other, reflected=True),
+                self._binary(operator.mod, other, reflected=True))
+
+    def __rpow__(self, other):
+        return self._binary(operator.pow, other, reflected=True)
+
+    # Augmented Assignment (rebinds, so int batches may become float)
+
+    def __iadd__(self, other):
+        return self._inplace(self + other)
+
+    def __isub__(self, other):
+        return self._inplace(self - other)
+
+    def __imul__(self, other):
+        return self._inplace(self * other)
+
+    def __itruediv__(self, other):
+        return self._inplace(self / other)
+
+    def __ifloordiv__(self, other):
+        return self._inplace(self // other)
+
+    def __imod__(self, other):
+        return self._inplace(self % other)
+
+    def __ipow__(self, other):
+        return self._inplace(self ** other)
+
+    # ============================================
+    # Unary Operators
+    # ============================================
+
+    def __neg__(self):
+        return self._unary(operator.neg)
+
+    def __pos__(self):
+        return self._unary(operator.pos)
+
+    def __abs__(self):
+        return self._unary(abs)
+
+    def __invert__(self):
+        return SpecialMethodsArray(_to_int(self.values))._unary(operator.invert)
+
+    # ============================================
+    # Type Conversion
+    # ============================================
+
+    def _scalar(self):
+        if len(self.values) != 1:
+            raise TypeError("only single-element SpecialMethodsArrays can be "
+                            "converted to Python scalars")
+        return self.values[0]
+
+    def __complex__(self):
+        return complex(self._scalar())
+
+    def __int__(self):
+        return int(self._scalar())
+
+    def __float__(self):
+        return float(self._scalar())
+
+    def __index__(self):
+        return operator.index(int(self._scalar()))
+
+    def __round__(self, n=0):
+        if np is not None:
+            return SpecialMethodsArray(np.round(self.values, n))
+        return SpecialMethodsArray([round(v, n) for v in self.values])
+
+    def __trunc__(self):
+        return self._unary(np.trunc if np is not None else math.trunc)
+
+    def __floor__(self):
+        return self._unary(np.floor if np is not None else math.floor)
+
+    def __ceil__(self):
+        return self._unary(np.ceil if np is not None else math.ceil)
+
+    def astype(self, kind):
+        """Convert every element with int, float, complex or bool."""
+        if np is not None:
+            return SpecialMethodsArray(self.values.astype(kind))
+        return SpecialMethodsArray([kind(v) for v in self.values])
+
+    # ============================================
+    # Bitwise Operators
+    # ============================================
+
+    def __and__(self, other):
+        return self._bitwise(operator.and_, other)
+
+    def __or__(self, other):
+        return self._bitwise(operator.or_, other)
+
+    def __xor__(self, other):
+        return self._bitwise(operator.xor, other)
+
+    def __lshift__(self, other):
+        return self._bitwise(operator.lshift, other)
+
+    def __rshift__(self, other):
+        return self._bitwise(operator.rshift, other)
+
+    def __rand__(self, other):
+        return self._bitwise(operator.and_, other, reflected=True)
+
+    def __ror__(self, other):
+        return self._bitwise(operator.or_, other, reflected=True)
+
+    def __rxor__(self, other):
+        return self._bitwise(operator.xor, other, reflected=True)
+
+    def __rlshift__(self, other):
+        return self._bitwise(operator.lshift, other, reflected=True)
+
+    def __rrshift__(self, other):
+        return self._bitwise(operator.rshift, other, reflected=True)
+
+    def __iand__(self, other):
+        return self._inplace(self & other)
+
+    def __ior__(self, other):
+        return self._inplace(self | other)
+
+    def __ixor__(self, other):
+        return self._inplace(self ^ other)
+
+    def __ilshift__(self, other):
+        return self._inplace(self << other)
+
+    def __irshift__(self, other):
+        return self._inplace(self >> other)
+
+
+# ============================================
+# Example Usage
+# ============================================
+
+if __name__ == "__main__":
+    import contextlib
+    import io
+    import time
+
+    print("=" * 50)
+    print(f"Backend: {'numpy' if np is not None else 'list'}")
+    print("=" * 50)
+    batch = SpecialMethodsArray(range(10))
+    print(f"batch: {batch}")
+    print(f"batch * 2 + 1: {batch * 2 + 1}")
+    print(f"batch > 4: {batch > 4}")
+    print(f"batch & 3: {batch & 3}")
+    print(f"10 - batch: {10 - batch}")
+
+    print("\n" + "=" * 50)
+    print("Timing 1,000,000 elements: (x * 3 + 7) % 11")
+    print("=" * 50)
+    count = 1_000_000
+    start = time.perf_counter()
+    result = (SpecialMethodsArray(range(count)) * 3 + 7) % 11
+    print(f"SpecialMethodsArray: {time.perf_counter() - start:.3f}s")
+    print(f"checksum: {sum(result.tolist())}")
+
+    # The per-object path prints on every construction; discard that output.
+    # It is timed on a tenth of the elements and scaled up.
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        total = sum(((SpecialMethods(i) * 3 + 7) % 11).value for i in range(count // 10))
+    print(f"SpecialMethods loop: ~{(time.perf_counter() - start) * 10:.3f}s (extrapolated)")
@@ -0,0 +1,171 @@
+"""
+Chunked async streaming for SpecialMethods data
+"""
+
+import asyncio
+from collections import deque
+
+
+class AsyncChunkStream:
+    """Bounded producer/consumer buffer consumed in chunks.
+
+    Producers `await put(...)` / `await put_many(...)` and are suspended
+    while the buffer holds `capacity` items (backpressure).  Consumers use
+    `async for chunk in stream` to receive lists of up to `chunk_size`
+    items.  Items sit in a deque, so each one is added and removed in O(1).
+
+    A consumer that may stop early should use `async with` (or call
+    aclose()) so the producer task is cancelled rather than left waiting.
+    """
+
+    def __init__(self, capacity=1024, chunk_size=64):
+        if capacity < 1 or chunk_size < 1:
+            raise ValueError("capacity and chunk_size must be positive")
+        self.capacity = capacity
+        self.chunk_size = chunk_size
+        self._items = deque()
+        self._changed = asyncio.Condition()
+        self._closed = False
+        self._error = None
+        self._producer = None
+
+    def __len__(self):
+        return len(self._items)
+
+    @property
+    def closed(self):
+        return self._closed
+
+    async def put(self, item):
+        """Add one item, waiting while the buffer is full."""
+        async with self._changed:
+            await self._changed.wait_for(lambda: self._closed or len(self._items) < self.capacity)
+            if self._closed:
+                raise RuntimeError("put() on a closed stream")
+            self._items.append(item)
+            self._changed.notify_all()
+
+    async def put_many(self, items):
+        """Add items in order, filling free capacity as it becomes available."""
+        items = list(items)
+        start = 0
+        while start < len(items):
+            async with self._changed:
+                await self._changed.wait_for(lambda: self._closed or len(self._items) < self.capacity)
+                if self._closed:
+                    raise RuntimeError("put_many() on a closed stream")
+                end = start + self.capacity - len(self._items)
+                self._items.extend(items[start:end])
+                start = end
+                self._changed.notify_all()
+
+    async def close(self, error=None):
+        """Stop accepting items; consumers finish the buffer, then stop.
+
+        If `error` is given it is raised to the consumer after the buffered
+        items are drained.
+        """
+        async with self._changed:
+            self._closed = True
+            self._error = error
+            self._changed.notify_all()
+
+    async def aclose(self):
+        """Stop the producer task (if any), close and discard the buffer."""
+        producer = self._producer
+        if producer is not None and not producer.done():
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+        await self.close()
+        self._items.clear()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+        return False
+
+    async def get_chunk(self, size=None):
+        """Up to `size` items; waits while empty, [] once closed and drained."""
+        size = size or self.chunk_size
+        async with self._changed:
+            await self._changed.wait_for(lambda: self._items or self._closed)
+            items = self._items
+            chunk = [items.popleft() for _ in range(min(size, len(items)))]
+            self._changed.notify_all()
+        if not chunk and self._error is not None:
+            raise self._error
+        return chunk
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        chunk = await self.get_chunk()
+        if not chunk:
+            raise StopAsyncIteration
+        return chunk
+
+
+async def _produce(stream, data):
+    try:
+        # put_many fills free capacity a slice at a time, so draining is O(n)
+        await stream.put_many(data)
+    except BaseException as exc:
+        await stream.close(exc)
+        raise
+    await stream.close()
+
+
+def stream_data(obj, chunk_size=64, capacity=1024):
+    """Drain obj.data through an AsyncChunkStream.
+
+    Like iterating obj with `async for`, the items are consumed (obj.data is
+    left empty), but the buffer is handed over in one step instead of
+    popping from the front of the list.  Must be called from a running
+    event loop; the producer task runs until the consumer has read
+    everything or the stream is closed with aclose():
+
+        async with stream_data(obj) as stream:
+            async for chunk in stream:
+                ...
+    """
+    data, obj.data = obj.data, []
+    stream = AsyncChunkStream(capacity=capacity, chunk_size=chunk_size)
+    stream._producer = asyncio.get_running_loop().create_task(_produce(stream, data))
+    return stream
+
+
+# ============================================
+# Example Usage
+# ============================================
+
+if __name__ == "__main__":
+    import time
+
+    from special_methods import FastSpecialMethods
+
+    async def drain_with_anext(obj):
+        total = 0
+        async for item in obj:
+            total += item
+        return total
+
+    async def drain_with_stream(obj):
+        total = 0
+        async with stream_data(obj, chunk_size=1024, capacity=8192) as stream:
+            async for chunk in stream:
+                total += sum(chunk)
+        return total
+
+    for count in (10_000, 100_000):
+        print("=" * 50)
+        print(f"Draining {count:,} items")
+        print("=" * 50)
+        for label, drain in (("__anext__", drain_with_anext), ("stream_data", drain_with_stream)):
+            obj = FastSpecialMethods(0, "buffer")
+            obj.data = list(range(count))
+            start = time.perf_counter()
+            total = asyncio.run(drain(obj))
+            print(f"{label:>12}: {time.perf_counter() - start:.3f}s (sum={total})")
@@ -0,0 +1,209 @@
+"""
+User store backed by a SQLite file.
+
+Same interface as UserStore, but the users live on disk, so a shard's
+size is bounded by its file rather than by the process's memory.  Only the
+collection metadata (total, per-domain counts, next id and modification
+sequence) is kept in memory so that count() stays O(1).
+"""
+
+import sqlite3
+import threading
+import time
+
+from models import User, email_domain
+from store import EmailExistsError
+
+_COLUMNS = "id, name, email, created_at, updated_at"
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL UNIQUE,
+    domain TEXT NOT NULL,
+    created_at INTEGER NOT NULL,
+    updated_at INTEGER
+);
+CREATE INDEX IF NOT EXISTS users_domain ON users (domain, id);
+CREATE INDEX IF NOT EXISTS users_created ON users (created_at);
+"""
+# Stay under SQLite's limit on bound parameters per statement
+_MAX_PARAMS = 500
+# SQLite integers are signed 64-bit; larger ids cannot be stored, so they
+# are simply not found
+_MIN_ID, _MAX_ID = -2**63, 2**63 - 1
+
+
+def _user(row):
+    return User(*row) if row else None
+
+
+class SQLiteUserStore:
+    """Users in one SQLite file; one connection guarded by this store's lock."""
+
+    def __init__(self, path, users=()):
+        self.path = path
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._total = 0
+        self._domain_counts = {}
+        for domain, count in self._db.execute("SELECT domain, COUNT(*) FROM users GROUP BY domain"):
+            self._domain_counts[domain] = count
+            self._total += count
+        self._next_id = (self._db.execute("SELECT MAX(id) FROM users").fetchone()[0] or 0) + 1
+        self._version = 0
+        for user in users:
+            self.add(user)
+
+    def _count_domain(self, email, delta):
+        domain = email_domain(email)
+        count = self._domain_counts.get(domain, 0) + delta
+        if count:
+            self._domain_counts[domain] = count
+        else:
+            del self._domain_counts[domain]
+        self._total += delta
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    # -- collection metadata ---------------------------------------------
+
+    def count(self, domain=None):
+        """Number of users, optionally within one email domain, in O(1)."""
+        if domain is None:
+            return self._total
+        return self._domain_counts.get(domain.lower(), 0)
+
+    def version(self):
+        """Modification sequence; changes whenever any user is written."""
+        return self._version
+
+    # -- reads ------------------------------------------------------------
+
+    def get(self, user_id):
+        if not _MIN_ID <= user_id <= _MAX_ID:
+            return None
+        with self._lock:
+            return _user(self._db.execute(
+                f"SELECT {_COLUMNS} FROM users WHERE id = ?", (user_id,)).fetchone())
+
+    def get_many(self, user_ids):
+        """Users (or None) for each id, in request order."""
+        user_ids = list(user_ids)
+        found = {}
+        stored = [user_id for user_id in user_ids if _MIN_ID <= user_id <= _MAX_ID]
+        with self._lock:
+            for i in range(0, len(stored), _MAX_PARAMS):
+                chunk = stored[i:i + _MAX_PARAMS]
+                rows = self._db.execute(
+                    f"SELECT {_COLUMNS} FROM users WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+                for row in rows:
+                    found[row[0]] = User(*row)
+        return [found.get(user_id) for user_id in user_ids]
+
+    def page(self, start, end, domain=None):
+        """Users with positions [start:end] in id order, optionally by domain."""
+        start = max(start, 0)
+        limit = -1 if end is None else max(end - start, 0)
+        where, params = ("WHERE domain = ?", [domain.lower()]) if domain is not None else ("", [])
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {_COLUMNS} FROM users {where} ORDER BY id LIMIT ? OFFSET ?",
+                params + [limit, start])
+            return [User(*row) for row in rows]
+
+    def page_after(self, after_id, limit, domain=None):
+        """Up to `limit` users with id > after_id, in id order (cursor paging)."""
+        if after_id >= _MAX_ID:
+            return []
+        where, params = "WHERE id > ?", [max(after_id, _MIN_ID)]
+        if domain is not None:
+            where += " AND domain = ?"
+            params.append(domain.lower())
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {_COLUMNS} FROM users {where} ORDER BY id LIMIT ?",
+                params + [max(limit, 0)])
+            return [User(*row) for row in rows]
+
+    def stats(self, bucket_seconds, since=None, top=None):
+        """Aggregate counts: total, per email domain and per time bucket."""
+        where, params = ("WHERE created_at >= ?", [since]) if since is not None else ("", [])
+        with self._lock:
+            total = self._db.execute(f"SELECT COUNT(*) FROM users {where}", params).fetchone()[0]
+            domains = self._db.execute(
+                f"SELECT domain, COUNT(*) AS n FROM users {where} "
+                f"GROUP BY domain ORDER BY n DESC, domain LIMIT ?",
+                params + [-1 if top is None else top]).fetchall()
+            histogram = self._db.execute(
+                f"SELECT created_at / ? * ? AS bucket, COUNT(*) FROM users {where} "
+                f"GROUP BY bucket ORDER BY bucket",
+                [bucket_seconds, bucket_seconds] + params).fetchall()
+        return {"total": total, "domains": domains, "histogram": histogram}
+
+    # -- writes -----------------------------------------------------------
+
+    def _insert(self, user):
+        try:
+            self._db.execute(
+                "INSERT INTO users (id, name, email, domain, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (user.id, user.name, user.email, email_domain(user.email),
+                 user.created_at, user.updated_at))
+        except sqlite3.IntegrityError:
+            if self.get(user.id) is not None:
+                raise ValueError(f"user id {user.id} already exists") from None
+            raise EmailExistsError(user.email) from None
+        self._count_domain(user.email, 1)
+        self._next_id = max(self._next_id, user.id + 1)
+        self._version += 1
+        return user
+
+    def add(self, user):
+        """Insert an existing record (keeping its id), e.g. when rebalancing."""
+        with self._lock:
+            return self._insert(user)
+
+    def create(self, name, email):
+        with self._lock:
+            return self._insert(User(self._next_id, name, email, int(time.time())))
+
+    def update(self, user_id, name=None, email=None):
+        """Update a user's fields; returns None if the user does not exist."""
+        with self._lock:
+            user = self.get(user_id)
+            if user is None:
+                return None
+            old_email = user.email
+            if name is not None:
+                user.name = name
+            if email is not None:
+                user.email = email
+            user.updated_at = int(time.time())
+            try:
+                self._db.execute(
+                    "UPDATE users SET name = ?, email = ?, domain = ?, updated_at = ? WHERE id = ?",
+                    (user.name, user.email, email_domain(user.email), user.updated_at, user_id))
+            except sqlite3.IntegrityError:
+                raise EmailExistsError(email) from None
+            if user.email != old_email:
+                self._count_domain(old_email, -1)
+                self._count_domain(user.email, 1)
+            self._version += 1
+            return user
+
+    def delete(self, user_id):
+        """Remove a user; returns the removed record or None."""
+        with self._lock:
+            user = self.get(user_id)
+            if user is None:
+                return None
+            self._db.execute("DELETE FROM users WHERE id = ?", (user_id,))
+            self._count_domain(user.email, -1)
+            self._version += 1
+            return user
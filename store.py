@@ -0,0 +1,155 @@
+"""
+Thread-safe in-memory user store.
+"""
+
+import threading
+import time
+from bisect import bisect_left, bisect_right
+
+from columnar import UserColumns
+from models import User, email_domain
+
+
+class UserStoreError(Exception):
+    """Base class for store errors surfaced to the API."""
+
+
+class EmailExistsError(UserStoreError):
+    """Raised when an email is already used by another user."""
+
+
+class UserStore:
+    """Users kept as compact User records, indexed by id and email.
+
+    Collection metadata (total, per-domain counts and a modification
+    sequence) is maintained on every write so listings never have to count.
+    """
+
+    def __init__(self, users=()):
+        self._lock = threading.RLock()
+        self._by_id = {}
+        self._ids = []      # sorted ids, for O(limit) pagination
+        self._emails = {}   # email -> id, for O(1) uniqueness checks
+        self._next_id = 1
+        self._columns = UserColumns()  # kept in step for reporting queries
+        self._domain_counts = {}       # email domain -> number of users
+        self._version = 0              # bumped on every write
+        for user in users:
+            self._insert(user)
+
+    def _insert(self, user):
+        self._by_id[user.id] = user
+        self._ids.insert(bisect_left(self._ids, user.id), user.id)
+        self._emails[user.email] = user.id
+        self._columns.append(user)
+        self._count_domain(user.email, 1)
+        self._next_id = max(self._next_id, user.id + 1)
+
+    def _count_domain(self, email, delta):
+        domain = email_domain(email)
+        count = self._domain_counts.get(domain, 0) + delta
+        if count:
+            self._domain_counts[domain] = count
+        else:
+            del self._domain_counts[domain]
+
+    def count(self, domain=None):
+        """Number of users, optionally within one email domain, in O(1)."""
+        if domain is None:
+            return len(self._ids)
+        return self._domain_counts.get(domain.lower(), 0)
+
+    def version(self):
+        """Modification sequence; changes whenever any user is written."""
+        return self._version
+
+    def get(self, user_id):
+        return self._by_id.get(user_id)
+
+    def get_many(self, user_ids):
+        """Users (or None) for each id, in request order, under one lock."""
+        with self._lock:
+            by_id = self._by_id
+            return [by_id.get(user_id) for user_id in user_ids]
+
+    def page(self, start, end, domain=None):
+        """Users with positions [start:end] in id order, optionally by domain."""
+        with self._lock:
+            if domain is None:
+                ids = self._ids
+            else:
+                ids = self._columns.ids_for_domain(domain.lower())
+            return [self._by_id[user_id] for user_id in ids[start:end]]
+
+    def page_after(self, after_id, limit, domain=None):
+        """Up to `limit` users with id > after_id, in id order (cursor paging)."""
+        with self._lock:
+            if domain is None:
+                ids = self._ids
+            else:
+                ids = self._columns.ids_for_domain(domain.lower())
+            start = bisect_right(ids, after_id)
+            return [self._by_id[user_id] for user_id in ids[start:start + limit]]
+
+    def add(self, user):
+        """Insert an existing record (keeping its id), e.g. when rebalancing."""
+        with self._lock:
+            if user.id in self._by_id:
+                raise ValueError(f"user id {user.id} already exists")
+            if user.email in self._emails:
+                raise EmailExistsError(user.email)
+            self._insert(user)
+            self._version += 1
+            return user
+
+    def create(self, name, email):
+        with self._lock:
+            if email in self._emails:
+                raise EmailExistsError(email)
+            user = User(self._next_id, name, email, int(time.time()))
+            self._insert(user)
+            self._version += 1
+            return user
+
+    def update(self, user_id, name=None, email=None):
+        """Update a user's fields; returns None if the user does not exist."""
+        with self._lock:
+            user = self._by_id.get(user_id)
+            if user is None:
+                return None
+            if email is not None and email != user.email:
+                if email in self._emails:
+                    raise EmailExistsError(email)
+                del self._emails[user.email]
+                self._emails[email] = user_id
+                self._columns.set_email(user_id, email)
+                self._count_domain(user.email, -1)
+                self._count_domain(email, 1)
+                user.email = email
+            if name is not None:
+                user.name = name
+            user.updated_at = int(time.time())
+            self._version += 1
+            return user
+
+    def delete(self, user_id):
+        """Remove a user; returns the removed record or None."""
+        with self._lock:
+            user = self._by_id.pop(user_id, None)
+            if user is None:
+                return None
+            del self._ids[bisect_left(self._ids, user_id)]
+            del self._emails[user.email]
+            self._columns.remove(user_id)
+            self._count_domain(user.email, -1)
+            self._version += 1
+            return user
+
+    def stats(self, bucket_seconds, since=None, top=None):
+        """Aggregate counts: total, per email domain and per time bucket."""
+        with self._lock:
+            return {
+                "total": self._columns.count(since),
+                "domains": self._columns.domain_counts(since, top),
+                "histogram": self._columns.histogram(bucket_seconds, since)
+            }
@@ -75,6 +75,30 @@ def test_api():
     response = requests.get(f"{BASE_URL}/users/999")
     print(f"Status: {response.status_code}")
     print(f"Response: {json.dumps(response.json(), indent=2)}")
+    print()
+    
+    # Test GET /users/stats
+    print("9. Getting user stats")
+    response = requests.get(f"{BASE_URL}/users/stats", params={"bucket": "day"})
+    print(f"Status: {response.status_code}")
+    print(f"Response: {json.dumps(response.json(), indent=2)}")
+    print()
+    
+    # Test POST /users/lookup (multi-get)
+    print("10. Getting several users by ID (one missing)")
+    response = requests.post(f"{BASE_URL}/users/lookup", json={"ids": [1, 2, 999]})
+    print(f"Status: {response.status_code}")
+    print(f"Response: {json.dumps(response.json(), indent=2)}")
+    print()
+    
+    # Test POST /users/bulk (one invalid item rejects the whole batch)
+    print("11. Creating several users at once (one invalid)")
+    response = requests.post(f"{BASE_URL}/users/bulk", json={"users": [
+        {"name": "Bulk One", "email": "bulk1@example.com"},
+        {"name": "", "email": "not-an-email"}
+    ]})
+    print(f"Status: {response.status_code}")
+    print(f"Response: {json.dumps(response.json(), indent=2)}")
 
 if __name__ == "__main__":
     try:
@@ -0,0 +1,97 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+# Two workers sharing one snapshot file: a writer and a reader
+WRITER_URL = "http://localhost:5061"
+READER_URL = "http://localhost:5062"
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def start_worker(port, env):
+    code = f"from app import app; app.run(port={port}, threaded=True)"
+    return subprocess.Popen([sys.executable, "-c", code], cwd=HERE, env={**os.environ, **env},
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def wait_for(check, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if check():
+                return
+        except requests.ConnectionError:
+            pass
+        time.sleep(0.1)
+    raise AssertionError("timed out")
+
+def test_snapshot():
+    print("Testing a snapshot writer and reader in separate processes")
+    print("=" * 50)
+    snapshot_path = os.path.join(tempfile.mkdtemp(), "users.snapshot")
+    env = {"USER_SNAPSHOT_PATH": snapshot_path, "USER_SNAPSHOT_WRITER_URL": WRITER_URL}
+    workers = []
+    try:
+        # The reader starts first and waits for the writer's snapshot
+        print("1. Reader before the writer has published")
+        workers.append(start_worker(5062, env))
+        wait_for(lambda: requests.get(f"{READER_URL}/users").status_code == 503)
+        print("Status: 503")
+
+        print("2. Starting the writer")
+        workers.append(start_worker(5061, {**env, "USER_SNAPSHOT_WRITER": "1"}))
+        # The snapshot is published before the writer's port is open
+        wait_for(lambda: requests.get(f"{READER_URL}/users").status_code == 200)
+        wait_for(lambda: requests.get(f"{WRITER_URL}/health").status_code == 200)
+
+        print("3. Writing through the writer, reading through the reader")
+        response = requests.post(f"{WRITER_URL}/users", json={"name": "Snap", "email": "snap@shared.io"})
+        assert response.status_code == 201, response.text
+        user_id = response.json()["data"]["id"]
+        wait_for(lambda: requests.get(f"{READER_URL}/users/{user_id}").status_code == 200)
+        print(f"Reader sees user {user_id}")
+
+        response = requests.get(f"{READER_URL}/users", params={"domain": "shared.io"})
+        assert [user["id"] for user in response.json()["data"]] == [user_id], response.text
+        response = requests.get(f"{READER_URL}/users", params={"domain": "shared.io", "after": 0})
+        assert response.json()["total"] == 1, response.text
+        response = requests.get(f"{READER_URL}/users/stats")
+        assert {"domain": "shared.io", "count": 1} in response.json()["by_domain"], response.text
+        response = requests.get(f"{READER_URL}/users", params={"ids": f"1,{user_id}"})
+        assert response.json()["found"] == 2, response.text
+        print("Domain filter, stats and multi-get match the writer")
+
+        print("4. Writing through the reader")
+        response = requests.post(f"{READER_URL}/users", json={"name": "Lost", "email": "lost@shared.io"})
+        assert response.status_code == 503 and response.json()["writer"] == WRITER_URL, response.text
+        assert requests.delete(f"{READER_URL}/users/{user_id}").status_code == 503
+        print(f"Status: 503, writer: {WRITER_URL}")
+
+        print("5. Deleting through the writer")
+        assert requests.delete(f"{WRITER_URL}/users/{user_id}").status_code == 200
+        # The writer reads its own store, so the delete is visible at once
+        assert requests.get(f"{WRITER_URL}/users/{user_id}").status_code == 404
+        wait_for(lambda: requests.get(f"{READER_URL}/users/{user_id}").status_code == 404)
+        print("Reader no longer sees the user")
+
+        print("6. Restarting the writer")
+        workers[1].terminate()
+        workers[1].wait()
+        assert requests.get(f"{READER_URL}/users/1").status_code == 200
+        workers[1] = start_worker(5061, {**env, "USER_SNAPSHOT_WRITER": "1"})
+        wait_for(lambda: requests.get(f"{WRITER_URL}/health").status_code == 200)
+        response = requests.post(f"{WRITER_URL}/users", json={"name": "Again", "email": "again@shared.io"})
+        user_id = response.json()["data"]["id"]
+        wait_for(lambda: requests.get(f"{READER_URL}/users/{user_id}").status_code == 200)
+        print("Reader kept serving and picked up the new writer's data")
+    finally:
+        for worker in workers:
+            worker.terminate()
+            worker.wait()
+    print()
+    print("Snapshot tests completed!")
+
+if __name__ == "__main__":
+    test_snapshot()